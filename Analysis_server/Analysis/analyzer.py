@@ -25,6 +25,8 @@ import time
 import traceback
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import islice
 from typing import Any
 
 import yaml
@@ -220,48 +222,63 @@ class GraphSitterAnalysis:
                 "external_modules": len(self.external_modules),
             }
 
+    @staticmethod
+    def _index_by_name(items_attr) -> dict[str, Any]:
+        """Map each name to the first item carrying it."""
+        items = items_attr if hasattr(items_attr, "__iter__") else []
+        by_name = {}
+        for item in items:
+            by_name.setdefault(getattr(item, "name", ""), item)
+        return by_name
+
+    @cached_property
+    def _functions_by_name(self) -> dict[str, Any]:
+        """Functions indexed by name, built on the first lookup."""
+        return self._index_by_name(getattr(self.codebase, "functions", []))
+
+    @cached_property
+    def _classes_by_name(self) -> dict[str, Any]:
+        """Classes indexed by name, built on the first lookup."""
+        return self._index_by_name(getattr(self.codebase, "classes", []))
+
     def get_function_analysis(self, function_name: str) -> dict[str, Any]:
         """Get detailed analysis for a specific function."""
-        functions_attr = getattr(self.codebase, "functions", [])
-        functions = list(functions_attr) if hasattr(functions_attr, "__iter__") else []
+        func = self._functions_by_name.get(function_name)
+        if func is None:
+            return {}
 
-        for func in functions:
-            if getattr(func, "name", "") == function_name:
-                try:
-                    return get_function_summary(func)
-                except Exception:
-                    # Fallback to basic analysis
-                    return {
-                        "name": func.name,
-                        "parameters": [p.name for p in getattr(func, "parameters", [])],
-                        "return_type": getattr(func, "return_type", None),
-                        "decorators": [d.name for d in getattr(func, "decorators", [])],
-                        "is_async": getattr(func, "is_async", False),
-                        "complexity": getattr(func, "complexity", 0),
-                        "usages": len(getattr(func, "usages", [])),
-                    }
-        return {}
+        try:
+            return get_function_summary(func)
+        except Exception:
+            # Fallback to basic analysis
+            return {
+                "name": func.name,
+                "parameters": [p.name for p in getattr(func, "parameters", [])],
+                "return_type": getattr(func, "return_type", None),
+                "decorators": [d.name for d in getattr(func, "decorators", [])],
+                "is_async": getattr(func, "is_async", False),
+                "complexity": getattr(func, "complexity", 0),
+                "usages": len(getattr(func, "usages", [])),
+            }
 
     def get_class_analysis(self, class_name: str) -> dict[str, Any]:
         """Get detailed analysis for a specific class."""
-        classes_attr = getattr(self.codebase, "classes", [])
-        classes = list(classes_attr) if hasattr(classes_attr, "__iter__") else []
+        cls = self._classes_by_name.get(class_name)
+        if cls is None:
+            return {}
 
-        for cls in classes:
-            if getattr(cls, "name", "") == class_name:
-                try:
-                    return get_class_summary(cls)
-                except Exception:
-                    # Fallback to basic analysis
-                    return {
-                        "name": cls.name,
-                        "methods": len(getattr(cls, "methods", [])),
-                        "attributes": len(getattr(cls, "attributes", [])),
-                        "superclasses": [sc.name for sc in getattr(cls, "superclasses", [])],
-                        "subclasses": [sc.name for sc in getattr(cls, "subclasses", [])],
-                        "is_abstract": getattr(cls, "is_abstract", False),
-                    }
-        return {}
+        try:
+            return get_class_summary(cls)
+        except Exception:
+            # Fallback to basic analysis
+            return {
+                "name": cls.name,
+                "methods": len(getattr(cls, "methods", [])),
+                "attributes": len(getattr(cls, "attributes", [])),
+                "superclasses": [sc.name for sc in getattr(cls, "superclasses", [])],
+                "subclasses": [sc.name for sc in getattr(cls, "subclasses", [])],
+                "is_abstract": getattr(cls, "is_abstract", False),
+            }
 
 
 class RuffIntegration:
@@ -417,6 +434,11 @@ class RuffIntegration:
 class LSPDiagnosticsCollector:
     """Collects diagnostics from Language Server Protocol servers."""
 
+    # Directories never searched for Python files to open in the language server
+    SKIPPED_DIRS = frozenset({"__pycache__", ".git", ".venv", "venv", "node_modules"})
+    # Files opened per run; each waits for diagnostics, so keep it small
+    MAX_FILES = 10
+
     def __init__(self, target_path: str):
         self.target_path = target_path
         self.diagnostics = []
@@ -447,26 +469,11 @@ class LSPDiagnosticsCollector:
                 if os.path.isfile(self.target_path) and self.target_path.endswith(".py"):
                     python_files = [self.target_path]
                 elif os.path.isdir(self.target_path):
-                    for root, dirs, files in os.walk(self.target_path):
-                        # Skip common ignore directories
-                        dirs[:] = [
-                            d
-                            for d in dirs
-                            if d
-                            not in {
-                                "__pycache__",
-                                ".git",
-                                ".venv",
-                                "venv",
-                                "node_modules",
-                            }
-                        ]
-                        for file in files:
-                            if file.endswith(".py"):
-                                python_files.append(os.path.join(root, file))
+                    # Stop walking as soon as enough files are found
+                    python_files = list(islice(self._iter_python_files(), self.MAX_FILES))
 
                 # Open files and collect diagnostics
-                for file_path in python_files[:10]:  # Limit for performance
+                for file_path in python_files[: self.MAX_FILES]:  # Limit for performance
                     try:
                         with open(file_path, encoding="utf-8") as f:
                             content = f.read()
@@ -505,6 +512,26 @@ class LSPDiagnosticsCollector:
 
         return errors
 
+    def _iter_python_files(self):
+        """Yield Python files under the target directory in os.walk's top-down order."""
+        pending = [self.target_path]
+        while pending:
+            subdirs = []
+            python_files = []
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            # Like os.walk, list symlinked directories but don't descend
+                            if entry.name not in self.SKIPPED_DIRS and not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        elif entry.name.endswith(".py"):
+                            python_files.append(entry.path)
+            except OSError:
+                continue
+            yield from python_files
+            pending.extend(reversed(subdirs))
+
     def _map_lsp_severity(self, severity: int) -> str:
         """Map LSP severity to our severity levels."""
         severity_map = {1: "ERROR", 2: "WARNING", 3: "INFO", 4: "HINT"}
@@ -254,12 +254,15 @@ def _extract_relevant_code_snippets(caller_code: str, enhanced_diagnostic: Enhan
     if not caller_code:
         return []
 
+    max_snippets = 5  # Limit to 5 most relevant snippets
     snippets = []
     lines = caller_code.split("\n")
 
     # Look for imports related to the diagnostic file
     file_name = os.path.basename(enhanced_diagnostic["relative_file_path"]).replace(".py", "")
     for i, line in enumerate(lines):
+        if len(snippets) >= max_snippets:
+            break
         if "import" in line and file_name in line:
             # Include surrounding context
             start = max(0, i - 2)
@@ -268,13 +271,18 @@ def _extract_relevant_code_snippets(caller_code: str, enhanced_diagnostic: Enhan
 
     # Look for function calls that might be related to the error
     diag_message = enhanced_diagnostic["diagnostic"].message.lower()
-    for i, line in enumerate(lines):
-        if any(word in line.lower() for word in diag_message.split() if len(word) > 3):
-            start = max(0, i - 1)
-            end = min(len(lines), i + 2)
-            snippets.append("\n".join(lines[start:end]))
+    keywords = [word for word in diag_message.split() if len(word) > 3]
+    if keywords:
+        for i, line in enumerate(lines):
+            if len(snippets) >= max_snippets:
+                break
+            lowered_line = line.lower()
+            if any(word in lowered_line for word in keywords):
+                start = max(0, i - 1)
+                end = min(len(lines), i + 2)
+                snippets.append("\n".join(lines[start:end]))
 
-    return snippets[:5]  # Limit to 5 most relevant snippets
+    return snippets
 
 
 def _analyze_module_dependencies(module_name: str, all_cached_modules: dict[str, Any]) -> dict[str, Any]:
@@ -9,10 +9,18 @@ import os
 import tempfile
 import shutil
 import subprocess
-import traceback
+import threading
+import time
 import uuid
+import weakref
 import math
 import ast
+import copy
+import hashlib
+import heapq
+import importlib.util
+import inspect
+import json
 import re  # Added for Halstead metrics
 from typing import Dict, List, Any, Optional, Union
 from collections import defaultdict, Counter
@@ -20,19 +28,41 @@ from datetime import datetime
 import asyncio
 import logging
 import networkx as nx
+from networkx.algorithms import approximation as nx_approximation
+
+# Optional igraph backend (C core) for metrics on larger visualization graphs.
+# Only its presence is checked here; load_igraph() imports it on first use.
+# Set ANALYZER_DISABLE_IGRAPH=1 to always use NetworkX.
+IGRAPH_AVAILABLE = (
+    os.environ.get("ANALYZER_DISABLE_IGRAPH") != "1"
+    and importlib.util.find_spec("igraph") is not None
+)
+
+# Optional orjson encoder for the large analysis responses.
+ORJSON_AVAILABLE = importlib.util.find_spec("orjson") is not None
+
+# Optional uvloop event loop and httptools parser for the uvicorn launcher.
+UVLOOP_AVAILABLE = importlib.util.find_spec("uvloop") is not None
+HTTPTOOLS_AVAILABLE = importlib.util.find_spec("httptools") is not None
 
 # FastAPI and web framework imports
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel, Field
 import uvicorn
 import os
 import logging
 import math
 import re
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Callable, Dict, List, Mapping, Optional, Any, Set, TextIO, Tuple, Union
+from types import MappingProxyType
+from dataclasses import dataclass
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict, deque
+from functools import cached_property, lru_cache, wraps
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
 from graph_sitter import Codebase
 from graph_sitter.core.symbol import Symbol
@@ -204,6 +234,7 @@ app = FastAPI(
     title="Graph-Sitter Comprehensive Analysis API",
     description="Complete codebase analysis, visualization, and transformation using graph-sitter",
     version="3.0.0",
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
 )
 
 # Configure CORS
@@ -215,9 +246,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global storage for analysis sessions
+# Default number of detailed items returned per page by the list endpoints
+DEFAULT_PAGE_SIZE = 500
+
+# Global storage for analysis sessions. Sessions are process-local: they point
+# at a clone on this host's disk and their error analysis holds live LSP
+# Diagnostic objects, so the API must run as a single worker process.
 analysis_sessions: Dict[str, Dict] = {}
 
+# Completed analyses keyed by (repo_url, branch, head SHA), most recent last.
+# Repeated /analyze calls for the same commit reuse the clone and parsed codebase.
+ANALYSIS_CACHE_SIZE = 16
+analysis_cache: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+analysis_cache_locks: Dict[Tuple[str, str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# Parsed codebases of recently used sessions, most recent last. Sessions only
+# keep metadata; evicted codebases are re-parsed from the clone on demand.
+CODEBASE_CACHE_SIZE = 4
+session_codebases: "OrderedDict[str, Codebase]" = OrderedDict()
+
+# LSP servers kept running between fix requests, keyed by analysis ID. A
+# server is shut down after LSP_IDLE_TIMEOUT seconds without fix requests.
+LSP_IDLE_TIMEOUT = 600
+session_lsp_servers: Dict[str, Dict[str, Any]] = {}
+
+# Rendered MDX pages keyed by a hash of the class docs they were rendered from,
+# most recent last. Pages are rendered on pool threads, hence the lock.
+MDX_CACHE_SIZE = 4096
+mdx_page_cache: "OrderedDict[str, str]" = OrderedDict()
+mdx_page_cache_lock = threading.Lock()
+
 # ============================================================================
 # PYDANTIC MODELS
 # ============================================================================
@@ -245,6 +303,9 @@ class ErrorAnalysisResponse(BaseModel):
     detailed_errors: List[Dict[str, Any]]
     error_patterns: List[Dict[str, Any]]
     suggestions: List[Dict[str, Any]]
+    next_offset: Optional[int] = Field(
+        default=None, description="Offset of the next page of detailed errors"
+    )
 
 
 class EntrypointAnalysisResponse(BaseModel):
@@ -281,6 +342,9 @@ class VisualizationRequest(BaseModel):
     filter_patterns: List[str] = Field(
         default_factory=list, description="Filter patterns"
     )
+    compute_metadata: bool = Field(
+        default=True, description="Compute per-node metrics such as complexity"
+    )
 
 
 class DeadCodeAnalysisResponse(BaseModel):
@@ -291,6 +355,9 @@ class DeadCodeAnalysisResponse(BaseModel):
     dead_variables: List[Dict[str, Any]]
     potential_dead_code: List[Dict[str, Any]]
     recommendations: List[str]
+    next_offset: Optional[int] = Field(
+        default=None, description="Offset of the next page of dead code items"
+    )
 
 
 class CodeQualityMetrics(BaseModel):
@@ -1279,18 +1346,10 @@ class GraphSitterAnalyzer:
         try:
             complexity = 1  # Base complexity
 
-            if hasattr(func, "source") and func.source:
-                source = func.source.lower()
-                # Count decision points
-                complexity += source.count("if ")
-                complexity += source.count("elif ")
-                complexity += source.count("for ")
-                complexity += source.count("while ")
-                complexity += source.count("except ")
-                complexity += source.count("and ")
-                complexity += source.count("or ")
-                complexity += source.count("try:")
-                complexity += source.count("with ")
+            source = getattr(func, "source", None)
+            if source:
+                # Count decision points, one C-level substring count per keyword
+                complexity += sum(map(source.lower().count, CYCLOMATIC_COMPLEXITY_KEYWORDS))
 
             return complexity
         except Exception:
@@ -1737,9 +1796,10 @@ class GraphSitterAnalyzer:
 
             import_graph.add_node(current_file.filepath)
             for imp in current_file.imports:
-                if hasattr(imp, "from_file") and imp.from_file:
-                    import_graph.add_edge(current_file.filepath, imp.from_file.filepath)
-                    add_file_imports(imp.from_file, visited)
+                imported_file = getattr(imp, "from_file", None)
+                if imported_file:
+                    import_graph.add_edge(current_file.filepath, imported_file.filepath)
+                    add_file_imports(imported_file, visited)
 
         add_file_imports(file_obj)
 
@@ -1865,11 +1925,276 @@ def clone_repository(repo_url: str, branch: str = "main") -> str:
         raise Exception(f"Failed to clone repository: {str(e)}")
 
 
+def resolve_remote_head(repo_url: str, branch: str = "main") -> Optional[str]:
+    """Resolve the commit SHA a remote branch points at without cloning"""
+    try:
+        result = subprocess.run(
+            ["git", "ls-remote", repo_url, branch],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+    except subprocess.TimeoutExpired:
+        logger.warning(f"Timed out resolving {branch} of {repo_url}")
+        return None
+
+    if result.returncode != 0 or not result.stdout.strip():
+        logger.warning(f"Could not resolve {branch} of {repo_url}: {result.stderr.strip()}")
+        return None
+    return result.stdout.split(None, 1)[0]
+
+
+def get_cached_analysis(cache_key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+    """Return a cached analysis whose clone is still on disk"""
+    entry = analysis_cache.get(cache_key)
+    if entry is None:
+        return None
+    if not os.path.exists(entry["repo_path"]):
+        # The clone was cleaned up or deleted with its session
+        del analysis_cache[cache_key]
+        return None
+    analysis_cache.move_to_end(cache_key)
+    return entry
+
+
+def copy_session_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the parts of an analysis a session mutates, so sessions sharing a cached one stay apart"""
+    error_analysis = analysis["error_analysis"]
+    return {
+        **analysis,
+        "error_analysis": {
+            **error_analysis,
+            "detailed_errors": [dict(err) for err in error_analysis["detailed_errors"]],
+        },
+    }
+
+
+def store_cached_analysis(cache_key: Tuple[str, str, str], entry: Dict[str, Any]):
+    """Cache an analysis, dropping older commits of the same branch"""
+    repo_url, branch, _ = cache_key
+    for key in [key for key in analysis_cache if key[:2] == (repo_url, branch)]:
+        del analysis_cache[key]
+        analysis_cache_locks.pop(key, None)
+
+    analysis_cache[cache_key] = entry
+    while len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+        key, _ = analysis_cache.popitem(last=False)
+        analysis_cache_locks.pop(key, None)
+
+
+def build_codebase(repo_path: str) -> Codebase:
+    """Parse a cloned repository with the analysis configuration"""
+    return Codebase(
+        repo_path,
+        config=CodebaseConfig(
+            method_usages=True,
+            generics=True,
+            sync_enabled=True,
+            full_range_index=True,
+            py_resolve_syspath=True,
+            exp_lazy_graph=False,
+        ),
+    )
+
+
+def remember_session_codebase(analysis_id: str, codebase: Codebase):
+    """Keep a session's codebase parsed, evicting the least recently used"""
+    session_codebases[analysis_id] = codebase
+    session_codebases.move_to_end(analysis_id)
+    while len(session_codebases) > CODEBASE_CACHE_SIZE:
+        evicted_id, _ = session_codebases.popitem(last=False)
+        # The visualization engine holds on to the evicted codebase
+        evicted_session = analysis_sessions.get(evicted_id)
+        if evicted_session is not None:
+            evicted_session.pop("viz_engine", None)
+
+
+async def get_session_codebase(analysis_id: str) -> Codebase:
+    """Return the session's codebase, re-parsing the clone if it was evicted"""
+    codebase = session_codebases.get(analysis_id)
+    if codebase is not None:
+        session_codebases.move_to_end(analysis_id)
+        return codebase
+
+    repo_path = analysis_sessions[analysis_id]["repo_path"]
+    if not os.path.exists(repo_path):
+        raise HTTPException(
+            status_code=410,
+            detail="Repository clone has been cleaned up, please re-run the analysis",
+        )
+    codebase = await asyncio.to_thread(build_codebase, repo_path)
+    remember_session_codebase(analysis_id, codebase)
+    return codebase
+
+
+def copy_clone(repo_path: str) -> str:
+    """Copy a clone to a new temporary directory"""
+    temp_dir = tempfile.mkdtemp(prefix="graph_sitter_")
+    private_path = os.path.join(temp_dir, os.path.basename(repo_path))
+    shutil.copytree(repo_path, private_path, symlinks=True)
+    return private_path
+
+
+async def get_writable_session_codebase(analysis_id: str) -> Codebase:
+    """
+    Return the session's codebase for an endpoint that writes to disk. A clone
+    shared with the analysis cache or other sessions is copied first, so the
+    write cannot change what they see.
+    """
+    session = analysis_sessions[analysis_id]
+    repo_path = session["repo_path"]
+    shared = any(entry["repo_path"] == repo_path for entry in analysis_cache.values()) or any(
+        other["repo_path"] == repo_path
+        for other_id, other in analysis_sessions.items()
+        if other_id != analysis_id
+    )
+    if not shared:
+        return await get_session_codebase(analysis_id)
+
+    if not os.path.exists(repo_path):
+        raise HTTPException(
+            status_code=410,
+            detail="Repository clone has been cleaned up, please re-run the analysis",
+        )
+    private_path = await asyncio.to_thread(copy_clone, repo_path)
+    logger.info(f"Copied shared clone {repo_path} to {private_path} for session {analysis_id}")
+
+    # Everything built from the shared clone now points at the wrong tree
+    session["repo_path"] = private_path
+    session["clone_expires_at"] = time.monotonic() + CLEANUP_DELAY
+    session_codebases.pop(analysis_id, None)
+    session.pop("viz_engine", None)
+    forget_session_docs(session)
+    shutdown_session_lsp_server(analysis_id)
+    await cleanup_temp_directory(private_path)
+    return await get_session_codebase(analysis_id)
+
+
+def get_session_lsp_server(analysis_id: str, codebase: Codebase) -> Dict[str, Any]:
+    """Return the session's running LSP server, starting it on first use"""
+    lsp_server = session_lsp_servers.get(analysis_id)
+    if lsp_server is None:
+        manager = LSPDiagnosticsManager(
+            codebase, Language(analysis_sessions[analysis_id]["language"])
+        )
+        manager.start_server()
+        lsp_server = {"manager": manager, "open_files": set(), "idle_timer": None}
+        session_lsp_servers[analysis_id] = lsp_server
+    else:
+        # The session's codebase may have been re-parsed since the server started
+        lsp_server["manager"].codebase = codebase
+
+    if lsp_server["idle_timer"] is not None:
+        lsp_server["idle_timer"].cancel()
+    lsp_server["idle_timer"] = asyncio.get_running_loop().call_later(
+        LSP_IDLE_TIMEOUT, shutdown_session_lsp_server, analysis_id
+    )
+    return lsp_server
+
+
+def shutdown_session_lsp_server(analysis_id: str):
+    """Stop the session's LSP server, if one is running"""
+    lsp_server = session_lsp_servers.pop(analysis_id, None)
+    if lsp_server is None:
+        return
+    if lsp_server["idle_timer"] is not None:
+        lsp_server["idle_timer"].cancel()
+    asyncio.get_running_loop().run_in_executor(
+        None, lsp_server["manager"].shutdown_server
+    )
+
+
+def check_page(limit: int, offset: int):
+    """Reject page parameters that cannot select any items"""
+    if limit < 1 or offset < 0:
+        raise HTTPException(
+            status_code=400,
+            detail="limit must be positive and offset must not be negative",
+        )
+
+
+async def get_session_docs(session: Dict[str, Any]):
+    """Return the session's structured docs, generating them on first use"""
+    structured_docs = session.get("structured_docs")
+    if structured_docs is None:
+        codebase = await get_session_codebase(session["id"])
+        structured_docs = generate_docs_json(
+            codebase, head_commit="latest"
+        )  # Assuming 'latest' or a real commit hash
+        docs_by_class_name = {}
+        for cls_doc in structured_docs.classes:
+            docs_by_class_name.setdefault(cls_doc.title, []).append(cls_doc)
+        session["structured_docs"] = structured_docs
+        session["docs_by_class_name"] = docs_by_class_name
+    return structured_docs
+
+
+def render_mdx_page_cached(cls_doc) -> str:
+    """Render a class page, reusing the page of identical class docs"""
+    key = hashlib.blake2b(
+        cls_doc.model_dump_json().encode(), digest_size=16
+    ).hexdigest()
+    with mdx_page_cache_lock:
+        mdx_content = mdx_page_cache.get(key)
+        if mdx_content is not None:
+            mdx_page_cache.move_to_end(key)
+            return mdx_content
+
+    mdx_content = render_mdx_page_for_class(cls_doc)
+    with mdx_page_cache_lock:
+        mdx_page_cache[key] = mdx_content
+        while len(mdx_page_cache) > MDX_CACHE_SIZE:
+            mdx_page_cache.popitem(last=False)
+    return mdx_content
+
+
+def write_mdx_pages(classes_to_document: List[Any], docs_output_dir: Path) -> List[Path]:
+    """Render and write one MDX page per class, returning the written paths"""
+    # Use class path for MDX route
+    output_paths = [
+        docs_output_dir / Path(cls_doc.path).with_suffix(".mdx").as_posix()
+        for cls_doc in classes_to_document
+    ]
+    # Create subdirectories based on the routes up front, once per directory
+    for directory in {output_path.parent for output_path in output_paths}:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def write_page(cls_doc, output_path: Path):
+        output_path.write_text(render_mdx_page_cached(cls_doc))
+        logger.info(f"Generated MDX for {cls_doc.title} at {output_path}")
+
+    workers = min(len(output_paths), os.cpu_count() or 1) or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() waits for every page and re-raises the first failure
+        list(executor.map(write_page, classes_to_document, output_paths))
+    return output_paths
+
+
+def forget_session_docs(session: Dict[str, Any]):
+    """Drop docs generated before the session's codebase changed"""
+    session.pop("structured_docs", None)
+    session.pop("docs_by_class_name", None)
+
+
 def calculate_doi(cls: Class):
     """Calculate the depth of inheritance for a given class."""
     return len(cls.superclasses) if hasattr(cls, "superclasses") else 0
 
 
+# Decision-point keywords counted by the AnalysisEngine complexity heuristic
+DECISION_POINT_KEYWORDS = ("if ", "elif ", "for ", "while ", "except ", "and ", "or ", "try:")
+
+# GraphSitterAnalyzer's cyclomatic complexity also counts context managers
+CYCLOMATIC_COMPLEXITY_KEYWORDS = DECISION_POINT_KEYWORDS + ("with ",)
+
+
+def count_decision_points(source: str) -> int:
+    """Count decision-point keywords in source (case-insensitive)."""
+    # str.count runs as a C-level substring search, so mapping it over the
+    # keyword tuple keeps the whole scan out of the interpreter loop
+    return sum(map(source.lower().count, DECISION_POINT_KEYWORDS))
+
+
 def get_operators_and_operands(function: Function):
     """Extract operators and operands from function for Halstead metrics."""
     operators = []
@@ -1949,6 +2274,23 @@ def cc_rank(complexity: int):
 # ============================================================================
 
 
+# Maps LSP severity names to the critical/major/minor error buckets
+LSP_SEVERITY_BUCKETS = {"error": "critical", "warning": "major"}
+
+# Matches `<pattern> = "` / `<pattern>="` assignments for hardcoded-secret detection
+_HARDCODED_SECRET_RE = re.compile(r'(password|secret|key|token)(?: = |=)"', re.IGNORECASE)
+
+
+# Error severity -> summary bucket. LSP errors and warnings count as critical
+# and major; info, hint and unknown diagnostics count as minor.
+ERROR_SEVERITY_BUCKETS = {
+    "error": "critical",
+    "critical": "critical",
+    "warning": "major",
+    "major": "major",
+}
+
+
 class AnalysisEngine:
     """
     Comprehensive analysis engine for deep code analysis, integrating Graph-Sitter and LSP.
@@ -1963,6 +2305,7 @@ class AnalysisEngine:
         )  # Pass codebase object
         self.context_cache = {}
         self.insight_cache = {}
+        self.inheritance_depth_cache: Dict[int, int] = {}
 
     async def perform_full_analysis(self) -> Dict[str, Any]:
         """Perform comprehensive codebase analysis using Graph-Sitter and LSP."""
@@ -1988,59 +2331,66 @@ class AnalysisEngine:
             logger.info("Retrieving enhanced diagnostics from LSP server...")
             all_lsp_diagnostics = self.lsp_manager.get_all_enhanced_diagnostics()
 
-            # 3. Perform Graph-Sitter Analysis
+            # 3. Perform Graph-Sitter Analysis off the event loop
             logger.info("Performing comprehensive Graph-Sitter analysis...")
-            codebase_summary = self.analyzer.get_codebase_overview()
-            tree_structure = self._build_tree_structure_from_graph_sitter(
-                self.codebase, all_lsp_diagnostics
-            )
-            error_analysis = self._analyze_errors_with_graph_sitter_enhanced(
-                self.codebase, all_lsp_diagnostics
+            return await asyncio.to_thread(
+                self._analyze_with_graph_sitter, all_lsp_diagnostics
             )
-            dead_code_analysis = (
-                self.analyzer.find_dead_code()
-            )  # Using GraphSitterAnalyzer
-            entrypoint_analysis = self._analyze_entrypoints_with_graph_sitter_enhanced(
-                self.codebase
-            )
-            dependency_graph = self._build_dependency_graph_from_graph_sitter(
-                self.codebase
-            )
-            code_quality_metrics = self._calculate_code_quality_metrics(self.codebase)
-            architectural_insights = self._analyze_architectural_patterns(self.codebase)
-            security_analysis = self._analyze_security_patterns(self.codebase)
-            performance_analysis = self._analyze_performance_patterns(self.codebase)
-
-            analysis = {
-                "codebase_summary": codebase_summary,
-                "tree_structure": tree_structure,
-                "error_analysis": error_analysis,
-                "dead_code_analysis": dead_code_analysis,
-                "entrypoint_analysis": entrypoint_analysis,
-                "dependency_graph": dependency_graph,
-                "code_quality_metrics": code_quality_metrics,
-                "architectural_insights": architectural_insights,
-                "security_analysis": security_analysis,
-                "performance_analysis": performance_analysis,
-                "metrics": {
-                    "files": len(list(self.codebase.files)),
-                    "functions": len(list(self.codebase.functions)),
-                    "classes": len(list(self.codebase.classes)),
-                    "symbols": len(list(self.codebase.symbols)),
-                    "imports": len(list(self.codebase.imports)),
-                    "external_modules": len(list(self.codebase.external_modules)),
-                },
-            }
-
-            return analysis
 
         except Exception as e:
-            logger.error(f"Error analyzing codebase with graph-sitter: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Error analyzing codebase with graph-sitter: {e}")
             raise Exception(f"Graph-sitter analysis failed: {str(e)}")
         finally:
             self.lsp_manager.shutdown_server()  # Ensure LSP server is shut down
 
+    def _analyze_with_graph_sitter(
+        self, all_lsp_diagnostics: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Run the CPU-bound Graph-Sitter passes over the codebase."""
+        codebase_summary = self.analyzer.get_codebase_overview()
+        tree_structure = self._build_tree_structure_from_graph_sitter(
+            self.codebase, all_lsp_diagnostics
+        )
+        error_analysis = self._analyze_errors_with_graph_sitter_enhanced(
+            self.codebase, all_lsp_diagnostics
+        )
+        dead_code_analysis = (
+            self.analyzer.find_dead_code()
+        )  # Using GraphSitterAnalyzer
+        entrypoint_analysis = self._analyze_entrypoints_with_graph_sitter_enhanced(
+            self.codebase
+        )
+        dependency_graph = self._build_dependency_graph_from_graph_sitter(
+            self.codebase
+        )
+        code_quality_metrics = self._calculate_code_quality_metrics(self.codebase)
+        architectural_insights = self._analyze_architectural_patterns(self.codebase)
+        security_analysis = self._analyze_security_patterns(self.codebase)
+        performance_analysis = self._analyze_performance_patterns(self.codebase)
+
+        analysis = {
+            "codebase_summary": codebase_summary,
+            "tree_structure": tree_structure,
+            "error_analysis": error_analysis,
+            "dead_code_analysis": dead_code_analysis,
+            "entrypoint_analysis": entrypoint_analysis,
+            "dependency_graph": dependency_graph,
+            "code_quality_metrics": code_quality_metrics,
+            "architectural_insights": architectural_insights,
+            "security_analysis": security_analysis,
+            "performance_analysis": performance_analysis,
+            "metrics": {
+                "files": len(list(self.codebase.files)),
+                "functions": len(list(self.codebase.functions)),
+                "classes": len(list(self.codebase.classes)),
+                "symbols": len(list(self.codebase.symbols)),
+                "imports": len(list(self.codebase.imports)),
+                "external_modules": len(list(self.codebase.external_modules)),
+            },
+        }
+
+        return analysis
+
     def _analyze_errors_with_graph_sitter_enhanced(
         self, codebase: Codebase, lsp_diagnostics: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
@@ -2050,7 +2400,7 @@ class AnalysisEngine:
             "critical": 0,
             "major": 0,
             "minor": 0,
-            "by_category": defaultdict(int),  # Use defaultdict for easier counting
+            "by_category": {},
             "detailed_errors": [],
             "error_patterns": [],
             "suggestions": [],
@@ -2072,16 +2422,6 @@ class AnalysisEngine:
                 "resolution_method": "ai_resolution_lsp",
             }
             errors["detailed_errors"].append(error_entry)
-            errors["by_category"][error_entry["category"]] += 1
-            if error_entry["severity"] == "error":  # LSP error severity is 1 (Error)
-                errors["critical"] += 1
-            elif (
-                error_entry["severity"] == "warning"
-            ):  # LSP warning severity is 2 (Warning)
-                errors["major"] += 1
-            else:  # Info, Hint, Unknown
-                errors["minor"] += 1
-            errors["total"] += 1
 
         # Add Graph-Sitter specific analysis (e.g., missing docstrings, unused imports, circular imports)
         # These are examples; actual implementation would involve traversing codebase objects
@@ -2104,9 +2444,6 @@ class AnalysisEngine:
                     "resolution_method": "generate_docstring",
                 }
                 errors["detailed_errors"].append(error_entry)
-                errors["by_category"]["missing_docstrings"] += 1
-                errors["minor"] += 1
-                errors["total"] += 1
 
         # Example: Unused imports
         for file_obj in codebase.files:
@@ -2126,19 +2463,9 @@ class AnalysisEngine:
                         "resolution_method": "remove_unused_imports",
                     }
                     errors["detailed_errors"].append(error_entry)
-                    errors["by_category"]["unused_imports"] += 1
-                    errors["minor"] += 1
-                    errors["total"] += 1
 
         # Example: Circular imports (using NetworkX)
-        import_graph = nx.DiGraph()
-        for file_obj in codebase.files:
-            import_graph.add_node(file_obj.filepath)
-            for imp in file_obj.imports:
-                if hasattr(imp, "from_file") and imp.from_file:
-                    import_graph.add_edge(file_obj.filepath, imp.from_file.filepath)
-
-        cycles = list(nx.simple_cycles(import_graph))
+        cycles = find_import_cycles(codebase)
         for cycle in cycles:
             for file_path in cycle:
                 error_entry = {
@@ -2153,9 +2480,18 @@ class AnalysisEngine:
                     "resolution_method": "refactor_circular_imports",
                 }
                 errors["detailed_errors"].append(error_entry)
-                errors["by_category"]["circular_imports"] += 1
-                errors["critical"] += 1
-                errors["total"] += 1
+
+        # Count every collected error once, by severity bucket and by category
+        detailed_errors = errors["detailed_errors"]
+        severity_counts = Counter(
+            ERROR_SEVERITY_BUCKETS.get(error["severity"], "minor")
+            for error in detailed_errors
+        )
+        errors["total"] = len(detailed_errors)
+        errors["critical"] = severity_counts["critical"]
+        errors["major"] = severity_counts["major"]
+        errors["minor"] = severity_counts["minor"]
+        errors["by_category"] = dict(Counter(error["category"] for error in detailed_errors))
 
         # Generate enhanced error patterns
         errors["error_patterns"] = self._analyze_error_patterns(
@@ -2390,7 +2726,7 @@ class AnalysisEngine:
                     "complexity": self._calculate_class_complexity(cls),
                     "methods_count": len(list(cls.methods)),
                     "attributes_count": len(list(cls.attributes)),
-                    "inheritance_depth": calculate_doi(cls),
+                    "inheritance_depth": self._calculate_inheritance_depth(cls),
                     "usages_count": len(list(cls.usages)),
                     "subclasses_count": len(list(cls.subclasses)),
                     "dependencies_count": len(list(cls.dependencies)),
@@ -3121,7 +3457,7 @@ class AnalysisEngine:
                                 "parent": getattr(cls, "parent", None) is not None,
                                 "resolved_value": getattr(cls, "resolved_value", None)
                                 is not None,
-                                "inheritance_depth": calculate_doi(cls),
+                                "inheritance_depth": self._calculate_inheritance_depth(cls),
                                 "complexity_score": self._calculate_class_complexity(
                                     cls
                                 ),
@@ -3286,20 +3622,14 @@ class AnalysisEngine:
         }
 
         # Build file dependency graph
-        file_graph = nx.DiGraph()
-        for file_obj in codebase.files:
-            file_graph.add_node(file_obj.filepath)
-            for imp in file_obj.imports:
-                if hasattr(imp, "from_file") and imp.from_file:
-                    file_graph.add_edge(file_obj.filepath, imp.from_file.filepath)
+        file_graph, _ = get_import_graph(codebase)
 
+        file_sccs = list(nx.strongly_connected_components(file_graph))
         dependency_graph["file_dependencies"] = {
             "nodes": len(file_graph.nodes),
             "edges": len(file_graph.edges),
-            "cycles": len(list(nx.simple_cycles(file_graph))),
-            "strongly_connected_components": len(
-                list(nx.strongly_connected_components(file_graph))
-            ),
+            "cycles": self._count_cycles(file_graph, file_sccs),
+            "strongly_connected_components": len(file_sccs),
         }
 
         # Build symbol dependency graph
@@ -3312,17 +3642,35 @@ class AnalysisEngine:
                 ):  # Exclude external modules from internal symbol graph
                     symbol_graph.add_edge(symbol.name, dep.name)
 
+        symbol_cycles = self._count_cycles(symbol_graph)
         dependency_graph["symbol_dependencies"] = {
             "nodes": len(symbol_graph.nodes),
             "edges": len(symbol_graph.edges),
-            "cycles": len(list(nx.simple_cycles(symbol_graph))),
+            "cycles": symbol_cycles,
             "max_depth": len(nx.dag_longest_path(symbol_graph))
-            if nx.is_directed_acyclic_graph(symbol_graph)
+            if symbol_cycles == 0
             else 0,
         }
 
         return dependency_graph
 
+    def _count_cycles(self, graph: nx.DiGraph, sccs: Optional[List[set]] = None) -> int:
+        """Count simple cycles, enumerating only within non-trivial SCCs"""
+        if sccs is None:
+            sccs = nx.strongly_connected_components(graph)
+
+        cycles = 0
+        for component in sccs:
+            if len(component) == 1:
+                # A singleton SCC is only cyclic through a self-loop
+                node = next(iter(component))
+                if graph.has_edge(node, node):
+                    cycles += 1
+                continue
+            cycles += sum(1 for _ in nx.simple_cycles(graph.subgraph(component)))
+
+        return cycles
+
     def _calculate_code_quality_metrics(self, codebase: Codebase) -> Dict[str, Any]:
         """Calculate comprehensive code quality metrics"""
         metrics = {
@@ -3510,11 +3858,14 @@ class AnalysisEngine:
         secret_patterns = ["password", "secret", "key", "token"]
         for file_obj in codebase.files:
             if hasattr(file_obj, "source") and file_obj.source:
+                # One case-insensitive scan per file instead of lowering the
+                # whole source twice per pattern
+                found = {
+                    m.group(1).lower()
+                    for m in _HARDCODED_SECRET_RE.finditer(file_obj.source)
+                }
                 for pattern in secret_patterns:
-                    if (
-                        f'{pattern} = "' in file_obj.source.lower()
-                        or f'{pattern}="' in file_obj.source.lower()
-                    ):
+                    if pattern in found:
                         security["hardcoded_secrets"].append(
                             {
                                 "file": file_obj.filepath,
@@ -3582,15 +3933,7 @@ class AnalysisEngine:
         errors = {"critical": 0, "major": 0, "minor": 0}
 
         # Add LSP diagnostics counts
-        for enhanced_diag in lsp_diagnostics:
-            diag = enhanced_diag["diagnostic"]
-            if diag.severity:
-                if diag.severity.name.lower() == "error":
-                    errors["critical"] += 1
-                elif diag.severity.name.lower() == "warning":
-                    errors["major"] += 1
-                else:  # Info, Hint, Unknown
-                    errors["minor"] += 1
+        self._tally_lsp_severities(errors, lsp_diagnostics)
 
         try:
             # Check for syntax errors (simplified)
@@ -3624,16 +3967,9 @@ class AnalysisEngine:
         func_start_line = func.start_point.line if hasattr(func, "start_point") else -1
         func_end_line = func.end_point.line if hasattr(func, "end_point") else -1
 
-        for enhanced_diag in lsp_diagnostics:
-            diag = enhanced_diag["diagnostic"]
-            if diag.range.line >= func_start_line and diag.range.line <= func_end_line:
-                if diag.severity:
-                    if diag.severity.name.lower() == "error":
-                        errors["critical"] += 1
-                    elif diag.severity.name.lower() == "warning":
-                        errors["major"] += 1
-                    else:  # Info, Hint, Unknown
-                        errors["minor"] += 1
+        self._tally_lsp_severities(
+            errors, lsp_diagnostics, func_start_line, func_end_line
+        )
 
         try:
             # Check complexity (not required to be presented as retrievable output)
@@ -3666,16 +4002,9 @@ class AnalysisEngine:
         cls_start_line = cls.start_point.line if hasattr(cls, "start_point") else -1
         cls_end_line = cls.end_point.line if hasattr(cls, "end_point") else -1
 
-        for enhanced_diag in lsp_diagnostics:
-            diag = enhanced_diag["diagnostic"]
-            if diag.range.line >= cls_start_line and diag.range.line <= cls_end_line:
-                if diag.severity:
-                    if diag.severity.name.lower() == "error":
-                        errors["critical"] += 1
-                    elif diag.severity.name.lower() == "warning":
-                        errors["major"] += 1
-                    else:  # Info, Hint, Unknown
-                        errors["minor"] += 1
+        self._tally_lsp_severities(
+            errors, lsp_diagnostics, cls_start_line, cls_end_line
+        )
 
         try:
             # Check for too many methods
@@ -3683,7 +4012,7 @@ class AnalysisEngine:
                 errors["major"] += 1
 
             # Check inheritance depth
-            if calculate_doi(cls) > 5:
+            if self._calculate_inheritance_depth(cls) > 5:
                 errors["major"] += 1
 
             # Check for missing docstring
@@ -3695,6 +4024,33 @@ class AnalysisEngine:
 
         return errors
 
+    def _tally_lsp_severities(
+        self,
+        errors: Dict[str, int],
+        lsp_diagnostics: List[Dict[str, Any]],
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+    ) -> None:
+        """Add LSP diagnostic counts to errors, optionally limited to a line range"""
+        severities = Counter(
+            diag.severity.name.lower()
+            for diag in (enhanced_diag["diagnostic"] for enhanced_diag in lsp_diagnostics)
+            if diag.severity
+            and (start_line is None or start_line <= diag.range.line <= end_line)
+        )
+        for severity, count in severities.items():
+            # Error -> critical, Warning -> major; Info, Hint, Unknown -> minor
+            errors[LSP_SEVERITY_BUCKETS.get(severity, "minor")] += count
+
+    def _calculate_inheritance_depth(self, cls: Class) -> int:
+        """Calculate depth of inheritance for a class, memoized per class object"""
+        key = id(cls)
+        depth = self.inheritance_depth_cache.get(key)
+        if depth is None:
+            depth = calculate_doi(cls)
+            self.inheritance_depth_cache[key] = depth
+        return depth
+
     def _is_entrypoint_file(self, file_obj: SourceFile) -> bool:
         """Check if a file is an entrypoint"""
         entrypoint_patterns = [
@@ -3766,16 +4122,7 @@ class AnalysisEngine:
             complexity = 1  # Base complexity
 
             if hasattr(func, "source") and func.source:
-                source = func.source.lower()
-                # Count decision points
-                complexity += source.count("if ")
-                complexity += source.count("elif ")
-                complexity += source.count("for ")
-                complexity += source.count("while ")
-                complexity += source.count("except ")
-                complexity += source.count("and ")
-                complexity += source.count("or ")
-                complexity += source.count("try:")
+                complexity += count_decision_points(func.source)
 
             return complexity
         except Exception:
@@ -3826,12 +4173,203 @@ class AnalysisEngine:
 # ============================================================================
 
 
+# Graphs above this node count skip exact clustering and all-pairs shortest paths
+LARGE_GRAPH_THRESHOLD = 500
+
+# Seed for the sampled clustering estimate, so repeated requests report the same value
+CLUSTERING_SEED = 0
+
+# Graphs above this node count compute metrics with igraph when it is installed
+IGRAPH_GRAPH_THRESHOLD = 200
+
+# Maximum number of serialized graphs kept per visualization engine
+GRAPH_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def load_igraph():
+    """Import igraph the first time a graph needs it"""
+    import igraph
+
+    return igraph
+
+
+class EdgeListGraph:
+    """
+    Minimal directed graph for visualization builders.
+    Stores node attributes and an ordered edge map; a NetworkX graph is only
+    materialized when graph metrics are requested.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.edges: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def __contains__(self, node) -> bool:
+        return node in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add_node(self, node: str, **attrs):
+        """Add a node or merge attributes into an existing one"""
+        self.nodes.setdefault(node, {}).update(attrs)
+
+    def add_edge(self, source: str, target: str, **attrs):
+        """Add an edge (creating missing endpoints) or merge its attributes"""
+        self.nodes.setdefault(source, {})
+        self.nodes.setdefault(target, {})
+        self.edges.setdefault((source, target), {}).update(attrs)
+
+    def add_nodes_from(self, nodes: List[Tuple[str, Dict[str, Any]]]):
+        """Add buffered (node, attrs) pairs in one pass"""
+        for node, attrs in nodes:
+            self.nodes.setdefault(node, {}).update(attrs)
+
+    def add_edges_from(self, edges: List[Tuple[str, str, Dict[str, Any]]]):
+        """Add buffered (source, target, attrs) triples in one pass"""
+        nodes = self.nodes
+        for source, target, attrs in edges:
+            nodes.setdefault(source, {})
+            nodes.setdefault(target, {})
+            self.edges.setdefault((source, target), {}).update(attrs)
+
+    def degree(self) -> Dict[str, int]:
+        """Total (in + out) degree per node, matching DiGraph.degree"""
+        degrees = dict.fromkeys(self.nodes, 0)
+        for source, target in self.edges:
+            degrees[source] += 1
+            degrees[target] += 1
+        return degrees
+
+    def density(self) -> float:
+        """Directed graph density, matching nx.density"""
+        n = len(self.nodes)
+        return len(self.edges) / (n * (n - 1)) if n > 1 else 0.0
+
+    def is_weakly_connected(self) -> bool:
+        """Check weak connectivity with a BFS over undirected adjacency"""
+        if not self.nodes:
+            return False
+
+        neighbors = defaultdict(list)
+        for source, target in self.edges:
+            neighbors[source].append(target)
+            neighbors[target].append(source)
+
+        start = next(iter(self.nodes))
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for neighbor in neighbors[queue.popleft()]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+        return len(seen) == len(self.nodes)
+
+    def to_networkx(self) -> nx.DiGraph:
+        """Materialize an equivalent NetworkX DiGraph for metric computation"""
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.nodes.items())
+        graph.add_edges_from(
+            (source, target, data) for (source, target), data in self.edges.items()
+        )
+        return graph
+
+
+def cached_graph(method):
+    """Memoize a create_* result per argument tuple until the engine is refreshed"""
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Bind arguments so positional, keyword and defaulted calls share a key
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        key = (method.__name__, tuple(arguments.arguments.items())[1:])
+        result = self.graph_cache.get(key)
+        if result is None:
+            result = method(self, *args, **kwargs)
+            if len(self.graph_cache) >= GRAPH_CACHE_SIZE:
+                # Evict the oldest entry; dicts preserve insertion order
+                self.graph_cache.pop(next(iter(self.graph_cache)))
+            self.graph_cache[key] = result
+        # Every caller gets its own copy, stamped with the time it was served,
+        # so mutating a returned graph cannot change the cached one
+        served = copy.deepcopy(result)
+        served["metadata"]["created_at"] = datetime.now().isoformat()
+        return served
+
+    return wrapper
+
+
 class EnhancedVisualizationEngine:  # Changed from VisualizationEngine
     """Enhanced visualization engine with dynamic target selection and scope control"""
 
-    def __init__(self, codebase: Codebase):
+    def __init__(self, codebase: Codebase, centrality_top_k: Optional[int] = None):
         self.codebase = codebase
+        # Report centrality for only the k highest-degree nodes when set
+        self.centrality_top_k = centrality_top_k
+        self.scope_cache: Dict[Tuple[str, str], Set[Symbol]] = {}
+        self.complexity_cache: Dict[int, int] = {}
+        self.graph_cache: Dict[tuple, Dict[str, Any]] = {}
+        self.line_count_cache: Dict[int, int] = {}
+
+    def refresh(self):
+        """Drop cached codebase indexes after the codebase has been modified"""
+        self.scope_cache.clear()
+        self.complexity_cache.clear()
+        self.graph_cache.clear()
+        self.line_count_cache.clear()
+        self.__dict__.pop("_module_index", None)
+        self.__dict__.pop("_class_adjacency", None)
+        self.__dict__.pop("_symbols_by_directory", None)
+        self.__dict__.pop("_dependency_index", None)
+
+    @cached_property
+    def _module_index(self) -> Dict[str, List[SourceFile]]:
+        """Index files under every ancestor directory of their path"""
+        index = defaultdict(list)
+        for file_obj in self.codebase.files:
+            parts = file_obj.filepath.split(os.sep)
+            for i in range(1, len(parts)):
+                index[os.sep.join(parts[:i])].append(file_obj)
+        return dict(index)
+
+    @cached_property
+    def _symbols_by_directory(self) -> Dict[str, List[Symbol]]:
+        """Group codebase symbols by the directory of their file"""
+        dirnames: Dict[str, str] = {}  # Many symbols share a file; split each path once
+        index = defaultdict(list)
+        for symbol in self.codebase.symbols:
+            filepath = symbol.filepath
+            dirname = dirnames.get(filepath)
+            if dirname is None:
+                dirname = dirnames[filepath] = os.path.dirname(filepath)
+            index[dirname].append(symbol)
+        return dict(index)
+
+    @cached_property
+    def _dependency_index(self) -> Dict[int, Tuple[Symbol, ...]]:
+        """Resolve the dependencies of every codebase symbol once, keyed by symbol id"""
+        return {id(symbol): tuple(symbol.dependencies) for symbol in self.codebase.symbols}
+
+    @cached_property
+    def _class_adjacency(self) -> Tuple[Dict[int, List[Class]], Dict[int, List[Class]]]:
+        """Map class ids to internal superclasses and subclasses in one codebase pass"""
+        parents: Dict[int, List[Class]] = {}
+        children: Dict[int, List[Class]] = defaultdict(list)
+        for cls in self.codebase.classes:
+            parents[id(cls)] = [
+                superclass
+                for superclass in cls.superclasses
+                if not isinstance(superclass, ExternalModule)
+            ]
+            for superclass in parents[id(cls)]:
+                children[id(superclass)].append(cls)
+        return parents, children
 
+    @cached_graph
     def create_dynamic_dependency_graph(
         self,
         target_type: str,
@@ -3841,7 +4379,7 @@ class EnhancedVisualizationEngine:  # Changed from VisualizationEngine
         include_external: bool = False,
     ) -> Dict[str, Any]:
         """Create dependency graph with dynamic target and scope selection"""
-        graph = nx.DiGraph()
+        graph = EdgeListGraph()
 
         # Get the target symbol
         target_symbol = self._get_target_symbol(target_type, target_name)
@@ -3858,47 +4396,68 @@ class EnhancedVisualizationEngine:  # Changed from VisualizationEngine
 
         return self._serialize_enhanced_graph(graph, target_symbol, scope)
 
+    @cached_graph
     def create_class_hierarchy_graph(
-        self, target_class: Optional[str] = None, include_methods: bool = True
+        self,
+        target_class: Optional[str] = None,
+        include_methods: bool = True,
+        compute_metadata: bool = True,
     ) -> Dict[str, Any]:
         """Create class hierarchy visualization"""
-        graph = nx.DiGraph()
+        graph = EdgeListGraph()
 
         if target_class:
             start_class = self.codebase.get_class(target_class)
             if not start_class:
                 raise ValueError(f"Class '{target_class}' not found")
-            self._build_class_hierarchy_subgraph(graph, start_class, include_methods)
+            self._build_class_hierarchy_subgraph(
+                graph, start_class, include_methods, compute_metadata
+            )
         else:
-            # Build full class hierarchy
-            for cls in self.codebase.classes:
-                self._build_class_hierarchy_subgraph(
-                    graph, cls, include_methods
-                )  # Changed from _add_class_hierarchy_node
+            # Build each inheritance component once, adding its nodes and edges in bulk
+            for component in self._class_components():
+                node_buffer, edge_buffer = self._collect_class_component(
+                    component, include_methods, compute_metadata
+                )
+                graph.add_nodes_from(node_buffer)
+                graph.add_edges_from(edge_buffer)
 
         return self._serialize_enhanced_graph(graph, target_class, "class_hierarchy")
 
+    @cached_graph
     def create_module_dependency_graph(
-        self, target_module: str, max_depth: int = 10
+        self, target_module: str, max_depth: int = 10, compute_metadata: bool = True
     ) -> Dict[str, Any]:
         """Create module-level dependency visualization"""
-        graph = nx.DiGraph()
-
-        # Get all files in the target module
-        module_files = [f for f in self.codebase.files if target_module in f.filepath]
+        graph = EdgeListGraph()
+
+        # Get all files in the target module, falling back to a path substring
+        # match when the target is not a directory of the codebase
+        module_files = self._module_index.get(target_module.rstrip(os.sep))
+        if module_files is None:
+            module_files = [
+                f for f in self.codebase.files if target_module in f.filepath
+            ]
         if not module_files:
             raise ValueError(f"Module '{target_module}' not found")
 
         # Build module dependency graph
-        self._build_module_dependency_subgraph(graph, module_files, max_depth)
+        self._build_module_dependency_subgraph(
+            graph, module_files, max_depth, compute_metadata
+        )
 
         return self._serialize_enhanced_graph(graph, target_module, "module")
 
+    @cached_graph
     def create_function_call_trace(
-        self, entry_function: str, target_function: str, max_depth: int = 15
+        self,
+        entry_function: str,
+        target_function: str,
+        max_depth: int = 15,
+        compute_metadata: bool = True,
     ) -> Dict[str, Any]:
         """Create call trace from entry function to target function"""
-        graph = nx.DiGraph()
+        graph = EdgeListGraph()
 
         start_func = self.codebase.get_function(entry_function)
         end_func = self.codebase.get_function(target_function)
@@ -3909,17 +4468,20 @@ class EnhancedVisualizationEngine:  # Changed from VisualizationEngine
             raise ValueError(f"Target function '{target_function}' not found")
 
         # Build call trace
-        self._build_call_trace_subgraph(graph, start_func, end_func, max_depth)
+        self._build_call_trace_subgraph(
+            graph, start_func, end_func, max_depth, compute_metadata
+        )
 
         return self._serialize_enhanced_graph(
             graph, f"{entry_function} -> {target_function}", "call_trace"
         )
 
+    @cached_graph
     def create_data_flow_graph(
         self, entry_point: str, max_depth: int = 10
     ) -> Dict[str, Any]:
         """Create data flow visualization"""
-        graph = nx.DiGraph()
+        graph = EdgeListGraph()
         start_symbol = self.codebase.get_symbol(entry_point)
 
         if not start_symbol:
@@ -3928,11 +4490,12 @@ class EnhancedVisualizationEngine:  # Changed from VisualizationEngine
         self._build_data_flow_subgraph(graph, start_symbol, max_depth)
         return self._serialize_enhanced_graph(graph, entry_point, "data_flow")
 
+    @cached_graph
     def create_blast_radius_graph(
         self, entry_point: str, max_depth: int = 10
     ) -> Dict[str, Any]:
         """Create blast radius visualization showing impact of changes"""
-        graph = nx.DiGraph()
+        graph = EdgeListGraph()
         start_symbol = self.codebase.get_symbol(entry_point)
 
         if not start_symbol:
@@ -3954,322 +4517,514 @@ class EnhancedVisualizationEngine:  # Changed from VisualizationEngine
         else:
             raise ValueError(f"Unknown target type: {target_type}")
 
-    def _get_scope_symbols(self, scope: str, target_symbol: Symbol) -> List[Symbol]:
-        """Get all symbols within the specified scope."""
+    def _get_scope_symbols(self, scope: str, target_symbol: Symbol) -> Set[Symbol]:
+        """Get all symbols within the specified scope as a set for O(1) membership."""
+        target_file = getattr(target_symbol, "file", None)
+        if scope == "codebase":
+            cache_key = (scope, "")
+        elif scope in ("module", "file") and target_file is not None:
+            cache_key = (scope, target_file.filepath)
+        else:
+            cache_key = None
+
+        if cache_key in self.scope_cache:
+            return self.scope_cache[cache_key]
+
         if scope == "codebase":
-            return list(self.codebase.symbols)
+            scope_symbols = set(self.codebase.symbols)
         elif scope == "module":
-            if hasattr(target_symbol, "file"):
-                module_path = os.path.dirname(target_symbol.file.filepath)
-                return [
-                    s
-                    for s in self.codebase.symbols
-                    if os.path.dirname(s.filepath) == module_path
-                ]
-            return []
+            scope_symbols = set()
+            if target_file is not None:
+                module_path = os.path.dirname(target_file.filepath)
+                scope_symbols = set(self._symbols_by_directory.get(module_path, ()))
         elif scope == "file":
-            if hasattr(target_symbol, "file"):
-                return list(target_symbol.file.symbols)
-            return []
+            scope_symbols = set()
+            if target_file is not None:
+                scope_symbols = set(target_file.symbols)
         elif scope == "class":
-            if hasattr(target_symbol, "parent_class") and target_symbol.parent_class:
-                return list(target_symbol.parent_class.methods) + list(
-                    target_symbol.parent_class.attributes
-                )
-            return []
+            scope_symbols = set()
+            parent_class = getattr(target_symbol, "parent_class", None)
+            if parent_class:
+                scope_symbols = set(parent_class.methods) | set(parent_class.attributes)
         elif scope == "function":
-            if (
-                hasattr(target_symbol, "parent_function")
-                and target_symbol.parent_function
-            ):
-                return list(
-                    target_symbol.parent_function.code_block.local_var_assignments
-                )
-            return []
+            scope_symbols = set()
+            parent_function = getattr(target_symbol, "parent_function", None)
+            if parent_function:
+                scope_symbols = set(parent_function.code_block.local_var_assignments)
         else:
             raise ValueError(f"Unknown scope type: {scope}")
 
+        if cache_key is not None:
+            self.scope_cache[cache_key] = scope_symbols
+        return scope_symbols
+
     def _build_scoped_dependency_graph(
         self,
-        graph: nx.DiGraph,
+        graph: EdgeListGraph,
         symbol: Symbol,
-        scope_symbols: List[Symbol],
+        scope_symbols: Set[Symbol],
         max_depth: int,
         include_external: bool,
-        depth: int = 0,
     ):
-        """Build dependency graph within specified scope recursively"""
-        if depth >= max_depth or symbol in graph:  # Avoid cycles and depth limit
-            return
-
-        graph.add_node(
-            symbol.name,
-            type=type(symbol).__name__,
-            file=symbol.filepath if hasattr(symbol, "filepath") else None,
-            is_target=True if depth == 0 else False,
-        )
+        """Build dependency graph within specified scope using an iterative BFS"""
+        dependency_index = self._dependency_index
+        node_buffer = []
+        edge_buffer = []
+        visited = set()
+        queue = deque([(symbol, 0)])
 
-        for dep in symbol.dependencies:
-            if not include_external and isinstance(dep, ExternalModule):
+        while queue:
+            symbol, depth = queue.popleft()
+            if depth >= max_depth or id(symbol) in visited:  # Avoid cycles and depth limit
                 continue
+            visited.add(id(symbol))
 
-            # Only include dependencies within scope or if external is allowed
-            if dep in scope_symbols or include_external:
-                graph.add_node(
-                    dep.name,
-                    type=type(dep).__name__,
-                    file=dep.filepath if hasattr(dep, "filepath") else None,
-                    in_scope=dep in scope_symbols,
+            node_buffer.append(
+                (
+                    symbol.name,
+                    {
+                        "type": type(symbol).__name__,
+                        "file": getattr(symbol, "filepath", None),
+                        "is_target": True if depth == 0 else False,
+                    },
                 )
-                graph.add_edge(symbol.name, dep.name, relationship="depends_on")
-
-                if dep in scope_symbols:  # Only recurse if dependency is within scope
-                    self._build_scoped_dependency_graph(
-                        graph,
-                        dep,
-                        scope_symbols,
-                        max_depth,
-                        include_external,
-                        depth + 1,
+            )
+
+            dependencies = dependency_index.get(id(symbol))
+            if dependencies is None:  # Symbol reached from outside codebase.symbols
+                dependencies = symbol.dependencies
+            for dep in dependencies:
+                if not include_external and isinstance(dep, ExternalModule):
+                    continue
+
+                # Only include dependencies within scope or if external is allowed
+                in_scope = dep in scope_symbols
+                if in_scope or include_external:
+                    node_buffer.append(
+                        (
+                            dep.name,
+                            {
+                                "type": type(dep).__name__,
+                                "file": getattr(dep, "filepath", None),
+                                "in_scope": in_scope,
+                            },
+                        )
                     )
+                    edge_buffer.append(
+                        (symbol.name, dep.name, {"relationship": "depends_on"})
+                    )
+
+                    if in_scope:  # Only traverse dependencies within scope
+                        queue.append((dep, depth + 1))
+
+        graph.add_nodes_from(node_buffer)
+        graph.add_edges_from(edge_buffer)
 
     def _build_class_hierarchy_subgraph(
-        self, graph: nx.DiGraph, cls: Class, include_methods: bool, depth: int = 0
+        self,
+        graph: EdgeListGraph,
+        cls: Class,
+        include_methods: bool,
+        compute_metadata: bool = True,
     ):
-        """Build class hierarchy subgraph recursively"""
-        if depth > 10 or cls in graph:  # Prevent infinite recursion and depth limit
-            return
-
-        # Add class node
-        graph.add_node(
-            cls.name,
-            type="class",
-            file=cls.filepath,
-            methods=len(cls.methods),
-            attributes=len(cls.attributes),
-            inheritance_depth=calculate_doi(cls),
+        """Build class hierarchy subgraph using an iterative BFS over cached adjacency"""
+        node_buffer, edge_buffer = self._collect_class_hierarchy(
+            cls, include_methods, set(), compute_metadata
         )
-
-        # Add superclass relationships
-        for superclass in cls.superclasses:
-            if not isinstance(superclass, ExternalModule):
-                graph.add_node(
-                    superclass.name,
-                    type="class",
-                    file=superclass.filepath,
-                    methods=len(superclass.methods),
-                    attributes=len(superclass.attributes),
-                )
-                graph.add_edge(cls.name, superclass.name, relationship="inherits_from")
-                self._build_class_hierarchy_subgraph(
-                    graph, superclass, include_methods, depth + 1
+        graph.add_nodes_from(node_buffer)
+        graph.add_edges_from(edge_buffer)
+
+    def _class_components(self) -> List[List[Class]]:
+        """Split codebase classes into connected inheritance components"""
+        parents, children = self._class_adjacency
+        position = {id(cls): i for i, cls in enumerate(self.codebase.classes)}
+        components = []
+        assigned = set()
+        for cls in self.codebase.classes:
+            if id(cls) in assigned:
+                continue
+            assigned.add(id(cls))
+            component = []
+            queue = deque([cls])
+            while queue:
+                current = queue.popleft()
+                component.append(current)
+                for related in parents.get(id(current), []) + children.get(id(current), []):
+                    if id(related) in position and id(related) not in assigned:
+                        assigned.add(id(related))
+                        queue.append(related)
+            # Keep codebase order within a component so traversal starts match
+            component.sort(key=lambda c: position[id(c)])
+            components.append(component)
+        return components
+
+    def _collect_class_component(
+        self, component: List[Class], include_methods: bool, compute_metadata: bool = True
+    ) -> Tuple[List[tuple], List[tuple]]:
+        """Collect nodes and edges for one inheritance component, expanding each class once"""
+        node_buffer = []
+        edge_buffer = []
+        visited = set()
+        for cls in component:
+            if id(cls) not in visited:
+                nodes, edges = self._collect_class_hierarchy(
+                    cls, include_methods, visited, compute_metadata
                 )
+                node_buffer.extend(nodes)
+                edge_buffer.extend(edges)
+        return node_buffer, edge_buffer
 
-        # Add subclass relationships
-        for subclass in cls.subclasses:
-            if not isinstance(subclass, ExternalModule):
-                graph.add_node(
-                    subclass.name,
-                    type="class",
-                    file=subclass.filepath,
-                    methods=len(subclass.methods),
-                    attributes=len(subclass.attributes),
-                )
-                graph.add_edge(subclass.name, cls.name, relationship="inherits_from")
-                self._build_class_hierarchy_subgraph(
-                    graph, subclass, include_methods, depth + 1
-                )
+    def _collect_class_hierarchy(
+        self,
+        cls: Class,
+        include_methods: bool,
+        visited: Set[int],
+        compute_metadata: bool = True,
+    ) -> Tuple[List[tuple], List[tuple]]:
+        """Collect class hierarchy nodes and edges reachable from cls"""
+        parents, children = self._class_adjacency
+        node_buffer = []
+        edge_buffer = []
+        queue = deque([(cls, 0)])
+
+        while queue:
+            cls, depth = queue.popleft()
+            if depth > 10 or id(cls) in visited:  # Avoid cycles and depth limit
+                continue
+            visited.add(id(cls))
+
+            # Add class node
+            attrs = {"type": "class", "file": cls.filepath}
+            if compute_metadata:
+                attrs["methods"] = len(cls.methods)
+                attrs["attributes"] = len(cls.attributes)
+                attrs["inheritance_depth"] = calculate_doi(cls)
+            node_buffer.append((cls.name, attrs))
+
+            if id(cls) in parents:
+                superclasses = parents[id(cls)]
+                subclasses = children.get(id(cls), [])
+            else:  # Class reached from outside codebase.classes
+                superclasses = [
+                    c for c in cls.superclasses if not isinstance(c, ExternalModule)
+                ]
+                subclasses = [
+                    c for c in cls.subclasses if not isinstance(c, ExternalModule)
+                ]
 
-        # Add methods if requested
-        if include_methods:
-            for method in cls.methods:
-                graph.add_node(
-                    f"{cls.name}.{method.name}",
-                    type="method",
-                    file=cls.filepath,
-                    complexity=self._calculate_function_complexity(method),
-                    parameters=len(method.parameters),
+            # Add superclass relationships
+            for superclass in superclasses:
+                attrs = {"type": "class", "file": superclass.filepath}
+                if compute_metadata:
+                    attrs["methods"] = len(superclass.methods)
+                    attrs["attributes"] = len(superclass.attributes)
+                node_buffer.append((superclass.name, attrs))
+                edge_buffer.append(
+                    (cls.name, superclass.name, {"relationship": "inherits_from"})
                 )
-                graph.add_edge(
-                    cls.name, f"{cls.name}.{method.name}", relationship="contains"
+                queue.append((superclass, depth + 1))
+
+            # Add subclass relationships
+            for subclass in subclasses:
+                attrs = {"type": "class", "file": subclass.filepath}
+                if compute_metadata:
+                    attrs["methods"] = len(subclass.methods)
+                    attrs["attributes"] = len(subclass.attributes)
+                node_buffer.append((subclass.name, attrs))
+                edge_buffer.append(
+                    (subclass.name, cls.name, {"relationship": "inherits_from"})
                 )
+                queue.append((subclass, depth + 1))
+
+            # Add methods if requested
+            if include_methods:
+                for method in cls.methods:
+                    attrs = {"type": "method", "file": cls.filepath}
+                    if compute_metadata:
+                        attrs["complexity"] = self._calculate_function_complexity(method)
+                        attrs["parameters"] = len(method.parameters)
+                    node_buffer.append((f"{cls.name}.{method.name}", attrs))
+                    edge_buffer.append(
+                        (cls.name, f"{cls.name}.{method.name}", {"relationship": "contains"})
+                    )
+
+        return node_buffer, edge_buffer
 
     def _build_module_dependency_subgraph(
-        self, graph: nx.DiGraph, module_files: List[SourceFile], max_depth: int
+        self,
+        graph: EdgeListGraph,
+        module_files: List[SourceFile],
+        max_depth: int,
+        compute_metadata: bool = True,
     ):
-        """Build module dependency subgraph recursively"""
-        for file_obj in module_files:
-            if file_obj in graph:  # Avoid cycles
+        """Build module dependency subgraph with a BFS bounded by an import-depth budget"""
+        node_buffer = []
+        edge_buffer = []
+        added = set()  # Filepaths that already have a node
+        expanded = set()  # Filepaths whose imports have been followed
+        queue = deque((file_obj, max_depth) for file_obj in module_files)
+
+        while queue:
+            file_obj, remaining_depth = queue.popleft()
+            filepath = file_obj.filepath
+            if filepath in expanded:  # Expand each file only once
                 continue
-            graph.add_node(
-                file_obj.filepath,
-                type="file",
-                functions=len(file_obj.functions),
-                classes=len(file_obj.classes),
-                lines=len(file_obj.source.splitlines())
-                if hasattr(file_obj, "source")
-                else 0,
-            )
+            expanded.add(filepath)
+
+            if filepath not in added:
+                added.add(filepath)
+                node_buffer.append(
+                    (filepath, self._file_node_attrs(file_obj, compute_metadata))
+                )
 
             # Add import relationships
             for imp in file_obj.imports:
-                if hasattr(imp, "from_file") and imp.from_file:
-                    target_file = imp.from_file
-                    if target_file not in graph:  # Add target file if not already added
-                        graph.add_node(
-                            target_file.filepath,
-                            type="file",
-                            functions=len(target_file.functions),
-                            classes=len(target_file.classes),
-                            lines=len(target_file.source.splitlines())
-                            if hasattr(target_file, "source")
-                            else 0,
+                target_file = getattr(imp, "from_file", None)
+                if target_file:
+                    target_path = target_file.filepath
+                    if target_path not in added:  # Add target file if not already added
+                        added.add(target_path)
+                        node_buffer.append(
+                            (target_path, self._file_node_attrs(target_file, compute_metadata))
                         )
-                    graph.add_edge(
-                        file_obj.filepath,
-                        target_file.filepath,
-                        relationship="imports_from",
-                        import_count=1,
-                    )
-                    # Recurse into imported modules if within depth
-                    if max_depth > 1:
-                        self._build_module_dependency_subgraph(
-                            graph, [target_file], max_depth - 1
+                    edge_buffer.append(
+                        (
+                            filepath,
+                            target_path,
+                            {"relationship": "imports_from", "import_count": 1},
                         )
+                    )
+                    # Follow imported modules while the depth budget allows
+                    if remaining_depth > 1 and target_path not in expanded:
+                        queue.append((target_file, remaining_depth - 1))
+
+        graph.add_nodes_from(node_buffer)
+        graph.add_edges_from(edge_buffer)
+
+    def _file_node_attrs(self, file_obj: SourceFile, compute_metadata: bool) -> Dict[str, Any]:
+        """Node attributes for a file, with size metrics only when requested"""
+        if not compute_metadata:
+            return {"type": "file"}
+        return {
+            "type": "file",
+            "functions": len(file_obj.functions),
+            "classes": len(file_obj.classes),
+            "lines": self._count_lines(file_obj),
+        }
 
     def _build_call_trace_subgraph(
         self,
-        graph: nx.DiGraph,
+        graph: EdgeListGraph,
         start_func: Function,
         end_func: Function,
         max_depth: int,
+        compute_metadata: bool = True,
     ):
-        """Build call trace from start to end function recursively"""
-        visited = set()
-
-        def trace_calls(func: Function, target: Function, depth=0):
-            if depth >= max_depth or func in visited:
-                return False
-
-            visited.add(func)
-            graph.add_node(
-                func.name,
-                type="function",
-                file=func.filepath,
-                complexity=self._calculate_function_complexity(func),
-                depth=depth,
-            )
+        """Build the shortest call trace from start to end function with a bidirectional BFS"""
+
+        def callees(func: Function) -> List[Function]:
+            called = (getattr(call, "function_definition", None) for call in func.function_calls)
+            return [f for f in called if f and not isinstance(f, ExternalModule)]
+
+        def callers(func: Function) -> List[Function]:
+            calling = (getattr(site, "parent_function", None) for site in func.call_sites)
+            return [f for f in calling if f is not None]
+
+        # Map function ids to the neighbour one step closer to each root, and to
+        # their distance from it
+        forward_parents = {id(start_func): None}
+        backward_parents = {id(end_func): None}
+        forward_depths = {id(start_func): 0}
+        backward_depths = {id(end_func): 0}
+        forward_frontier = [start_func]
+        backward_frontier = [end_func]
+        meeting = start_func if start_func == end_func else None
+        path_length = 0
+
+        # A trace of n calls puts end_func at depth n, which must stay below max_depth
+        while meeting is None and forward_frontier and backward_frontier:
+            if path_length + 1 >= max_depth:
+                break
+            path_length += 1
 
-            if func == target:
-                return True
+            # Expand the smaller frontier one level
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, depths, other_depths, neighbours = (
+                    forward_frontier, forward_parents, forward_depths, backward_depths, callees
+                )
+            else:
+                frontier, parents, depths, other_depths, neighbours = (
+                    backward_frontier, backward_parents, backward_depths, forward_depths, callers
+                )
 
-            for call in func.function_calls:
-                if hasattr(call, "function_definition") and call.function_definition:
-                    called_func = call.function_definition
-                    if not isinstance(called_func, ExternalModule):
-                        graph.add_edge(
-                            func.name, called_func.name, relationship="calls"
-                        )
-                        if trace_calls(called_func, target, depth + 1):
-                            return True
+            # Finish the whole level and keep the meeting with the shortest trace
+            next_frontier = []
+            meeting_length = None
+            for func in frontier:
+                depth = depths[id(func)] + 1
+                for neighbour in neighbours(func):
+                    if id(neighbour) in parents:
+                        continue
+                    parents[id(neighbour)] = func
+                    depths[id(neighbour)] = depth
+                    if id(neighbour) in other_depths:
+                        length = depth + other_depths[id(neighbour)]
+                        if meeting_length is None or length < meeting_length:
+                            meeting, meeting_length = neighbour, length
+                    else:
+                        next_frontier.append(neighbour)
 
-            return False
+            if frontier is forward_frontier:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
 
-        trace_calls(start_func, end_func)
+        if meeting is None:  # No trace within max_depth; show the entry point alone
+            path = [start_func]
+        else:
+            path = [meeting]
+            while forward_parents[id(path[-1])] is not None:
+                path.append(forward_parents[id(path[-1])])
+            path.reverse()
+            while backward_parents[id(path[-1])] is not None:
+                path.append(backward_parents[id(path[-1])])
+
+        for depth, func in enumerate(path):
+            attrs = {"type": "function", "file": func.filepath}
+            if compute_metadata:
+                attrs["complexity"] = self._calculate_function_complexity(func)
+            attrs["depth"] = depth
+            graph.add_node(func.name, **attrs)
+        graph.add_edges_from(
+            (caller.name, callee.name, {"relationship": "calls"})
+            for caller, callee in zip(path, path[1:])
+        )
 
     def _build_data_flow_subgraph(
-        self, graph: nx.DiGraph, symbol: Symbol, max_depth: int, depth: int = 0
+        self, graph: EdgeListGraph, symbol: Symbol, max_depth: int
     ):
-        """Build data flow subgraph recursively"""
-        if depth >= max_depth or symbol in graph:  # Avoid cycles and depth limit
-            return
+        """Build data flow subgraph using an iterative BFS"""
+        node_buffer = []
+        edge_buffer = []
+        visited = set()
+        queue = deque([(symbol, 0)])
 
-        graph.add_node(
-            symbol.name,
-            type=type(symbol).__name__,
-            file=symbol.filepath if hasattr(symbol, "filepath") else None,
-        )
+        while queue:
+            symbol, depth = queue.popleft()
+            if depth >= max_depth or id(symbol) in visited:  # Avoid cycles and depth limit
+                continue
+            visited.add(id(symbol))
 
-        # Track variable usages and assignments
-        if hasattr(symbol, "variable_usages"):
-            for usage in symbol.variable_usages:
-                if hasattr(usage, "name"):
-                    graph.add_node(
-                        usage.name,
-                        type="variable",
-                        file=usage.file.filepath if hasattr(usage, "file") else None,
-                    )
-                    graph.add_edge(symbol.name, usage.name, relationship="uses_data")
-                    # Recurse into variable definition if available
-                    if (
-                        hasattr(usage, "resolved_symbol")
-                        and usage.resolved_symbol
-                        and usage.resolved_symbol not in graph
-                    ):
-                        self._build_data_flow_subgraph(
-                            graph, usage.resolved_symbol, max_depth, depth + 1
-                        )
+            node_buffer.append(
+                (
+                    symbol.name,
+                    {
+                        "type": type(symbol).__name__,
+                        "file": getattr(symbol, "filepath", None),
+                    },
+                )
+            )
 
-        if hasattr(symbol, "assignments"):  # For symbols that are assigned values
-            for assignment in symbol.assignments:
-                if hasattr(assignment, "name"):
-                    graph.add_node(
-                        assignment.name,
-                        type="assignment",
-                        file=assignment.file.filepath
-                        if hasattr(assignment, "file")
-                        else None,
+            # Track variable usages and assignments
+            for usage in getattr(symbol, "variable_usages", ()):
+                if getattr(usage, "name", None) is not None:
+                    node_buffer.append(
+                        (
+                            usage.name,
+                            {
+                                "type": "variable",
+                                "file": getattr(getattr(usage, "file", None), "filepath", None),
+                            },
+                        )
                     )
-                    graph.add_edge(
-                        assignment.name, symbol.name, relationship="assigns_to"
+                    edge_buffer.append(
+                        (symbol.name, usage.name, {"relationship": "uses_data"})
                     )
-                    # Recurse into assigned value's dependencies
-                    if hasattr(assignment, "value") and hasattr(
-                        assignment.value, "dependencies"
-                    ):
-                        for dep in assignment.value.dependencies:
-                            if dep not in graph:
-                                self._build_data_flow_subgraph(
-                                    graph, dep, max_depth, depth + 1
-                                )
-
+                    # Follow the variable definition if available
+                    resolved_symbol = getattr(usage, "resolved_symbol", None)
+                    if resolved_symbol:
+                        queue.append((resolved_symbol, depth + 1))
+
+            # For symbols that are assigned values
+            for assignment in getattr(symbol, "assignments", ()):
+                if getattr(assignment, "name", None) is not None:
+                    node_buffer.append(
+                        (
+                            assignment.name,
+                            {
+                                "type": "assignment",
+                                "file": getattr(
+                                    getattr(assignment, "file", None), "filepath", None
+                                ),
+                            },
+                        )
+                    )
+                    edge_buffer.append(
+                        (assignment.name, symbol.name, {"relationship": "assigns_to"})
+                    )
+                    # Follow the assigned value's dependencies
+                    value = getattr(assignment, "value", None)
+                    for dep in getattr(value, "dependencies", ()):
+                        queue.append((dep, depth + 1))
+
+        graph.add_nodes_from(node_buffer)
+        graph.add_edges_from(edge_buffer)
+
     def _build_blast_radius_subgraph(
-        self, graph: nx.DiGraph, symbol: Symbol, max_depth: int, depth: int = 0
+        self, graph: EdgeListGraph, symbol: Symbol, max_depth: int
     ):
-        """Build blast radius subgraph showing impact of changes recursively"""
-        if depth >= max_depth or symbol in graph:  # Avoid cycles and depth limit
-            return
+        """Build blast radius subgraph showing impact of changes using an iterative BFS"""
+        node_buffer = []
+        edge_buffer = []
+        added = set(graph.nodes)
+        visited = set()
+        queue = deque([(symbol, 0)])
 
-        graph.add_node(
-            symbol.name,
-            type=type(symbol).__name__,
-            file=symbol.filepath if hasattr(symbol, "filepath") else None,
-            impact_level=depth,
-        )
+        while queue:
+            symbol, depth = queue.popleft()
+            if depth >= max_depth or id(symbol) in visited:  # Avoid cycles and depth limit
+                continue
+            visited.add(id(symbol))
 
-        # Add all usages (things that would be affected by changes)
-        for usage in symbol.usages:
-            if hasattr(usage, "usage_symbol"):
-                affected_symbol = usage.usage_symbol
-                if affected_symbol not in graph:  # Avoid re-adding nodes
-                    graph.add_node(
-                        affected_symbol.name,
-                        type=type(affected_symbol).__name__,
-                        file=affected_symbol.filepath
-                        if hasattr(affected_symbol, "filepath")
-                        else None,
-                        impact_level=depth + 1,
-                    )
-                graph.add_edge(
-                    symbol.name, affected_symbol.name, relationship="impacts"
+            added.add(symbol.name)
+            node_buffer.append(
+                (
+                    symbol.name,
+                    {
+                        "type": type(symbol).__name__,
+                        "file": getattr(symbol, "filepath", None),
+                        "impact_level": depth,
+                    },
                 )
+            )
 
-                self._build_blast_radius_subgraph(
-                    graph, affected_symbol, max_depth, depth + 1
-                )
+            # Add all usages (things that would be affected by changes)
+            for usage in symbol.usages:
+                affected_symbol = getattr(usage, "usage_symbol", None)
+                if affected_symbol is not None:
+                    if affected_symbol.name not in added:  # Avoid re-adding nodes
+                        added.add(affected_symbol.name)
+                        node_buffer.append(
+                            (
+                                affected_symbol.name,
+                                {
+                                    "type": type(affected_symbol).__name__,
+                                    "file": getattr(affected_symbol, "filepath", None),
+                                    "impact_level": depth + 1,
+                                },
+                            )
+                        )
+                    edge_buffer.append(
+                        (symbol.name, affected_symbol.name, {"relationship": "impacts"})
+                    )
+
+                    queue.append((affected_symbol, depth + 1))
+
+        graph.add_nodes_from(node_buffer)
+        graph.add_edges_from(edge_buffer)
 
     def _serialize_enhanced_graph(
-        self, graph: nx.DiGraph, target_info: Union[str, Symbol], graph_type: str
+        self, graph: EdgeListGraph, target_info: Union[str, Symbol], graph_type: str
     ) -> Dict[str, Any]:
         """Enhanced graph serialization with additional metadata"""
         base_result = self._serialize_graph(graph)
@@ -4286,73 +5041,311 @@ class EnhancedVisualizationEngine:  # Changed from VisualizationEngine
             "graph_type": graph_type,
             "created_at": datetime.now().isoformat(),
             "node_types": Counter(
-                data.get("type", "unknown") for _, data in graph.nodes(data=True)
+                data.get("type", "unknown") for data in graph.nodes.values()
             ),
             "relationship_types": Counter(
-                data.get("relationship", "unknown")
-                for _, _, data in graph.edges(data=True)
+                data.get("relationship", "unknown") for data in graph.edges.values()
             ),
         }
 
         # Add graph analysis
-        if len(graph.nodes) > 0:
-            base_result["analysis"] = {
-                "centrality": dict(nx.degree_centrality(graph)),
-                "clustering": dict(nx.clustering(graph.to_undirected())),
-                "shortest_paths": dict(nx.shortest_path_length(graph))
-                if nx.is_connected(graph.to_undirected())
-                else {},
-            }
+        if len(graph.nodes) > IGRAPH_GRAPH_THRESHOLD and IGRAPH_AVAILABLE:
+            base_result["analysis"] = self._analyze_graph_igraph(graph)
+        elif len(graph.nodes) > 0:
+            base_result["analysis"] = self._analyze_graph_networkx(graph)
 
         return base_result
 
-    def _serialize_graph(self, graph: nx.DiGraph) -> Dict[str, Any]:
-        """Serialize NetworkX graph to JSON-serializable format"""
+    def _degree_centrality(self, graph: EdgeListGraph) -> Dict[str, float]:
+        """Degree centrality computed inline from the edge list, optionally top-k only"""
+        degrees = graph.degree()
+        # Matches nx.degree_centrality, which scores a lone node 1.0
+        if len(degrees) <= 1:
+            return {node: 1.0 for node in degrees}
+        scale = 1.0 / (len(degrees) - 1)
+        if self.centrality_top_k is not None and self.centrality_top_k < len(degrees):
+            items = heapq.nlargest(
+                self.centrality_top_k, degrees.items(), key=lambda item: item[1]
+            )
+        else:
+            items = degrees.items()
+        return {node: degree * scale for node, degree in items}
+
+    def _analyze_graph_networkx(self, graph: EdgeListGraph) -> Dict[str, Any]:
+        """Compute centrality, clustering and path metrics with NetworkX"""
+        # Metrics need real graph algorithms, so materialize NetworkX only here
+        # and share a read-only undirected view rather than copies
+        nx_graph = graph.to_networkx()
+        undirected = nx_graph.to_undirected(as_view=True)
+        if len(graph.nodes) > LARGE_GRAPH_THRESHOLD:
+            # Per-node clustering and all-pairs shortest paths grow quadratically
+            # or worse; report a sampled average clustering coefficient instead
+            return {
+                "centrality": self._degree_centrality(graph),
+                "clustering": {},
+                "average_clustering": nx_approximation.average_clustering(
+                    undirected, trials=1000, seed=CLUSTERING_SEED
+                ),
+                "shortest_paths": {},
+                "approximated": True,
+            }
+
         return {
-            "nodes": [
-                {"id": node, "label": node, **data}
-                for node, data in graph.nodes(data=True)
-            ],
-            "edges": [
-                {"source": source, "target": target, **data}
-                for source, target, data in graph.edges(data=True)
-            ],
-            "metrics": {
-                "node_count": len(graph.nodes),
-                "edge_count": len(graph.edges),
-                "density": nx.density(graph),
-                "is_connected": nx.is_weakly_connected(graph),
-            },
+            "centrality": self._degree_centrality(graph),
+            "clustering": dict(nx.clustering(undirected)),
+            "shortest_paths": dict(nx.shortest_path_length(nx_graph))
+            if nx.is_connected(undirected)
+            else {},
+        }
+
+    def _analyze_graph_igraph(self, graph: EdgeListGraph) -> Dict[str, Any]:
+        """Compute the same metrics as _analyze_graph_networkx using igraph"""
+        names = list(graph.nodes)
+        index = {name: i for i, name in enumerate(names)}
+        igraph = load_igraph()
+        ig_graph = igraph.Graph(
+            n=len(names),
+            edges=[(index[source], index[target]) for source, target in graph.edges],
+            directed=True,
+        )
+        undirected = ig_graph.as_undirected(mode="collapse")
+        undirected.simplify()
+
+        analysis = {"centrality": self._degree_centrality(graph)}
+
+        if len(names) > LARGE_GRAPH_THRESHOLD:
+            # Exact average clustering is cheap in igraph, but all-pairs paths are not
+            analysis.update(
+                {
+                    "clustering": {},
+                    "average_clustering": undirected.transitivity_avglocal_undirected(
+                        mode="zero"
+                    ),
+                    "shortest_paths": {},
+                    "approximated": True,
+                }
+            )
+            return analysis
+
+        analysis["clustering"] = dict(
+            zip(names, undirected.transitivity_local_undirected(mode="zero"))
+        )
+        shortest_paths = {}
+        if undirected.is_connected():
+            for name, row in zip(names, ig_graph.distances(mode="out")):
+                shortest_paths[name] = {
+                    names[i]: int(distance)
+                    for i, distance in enumerate(row)
+                    if distance != math.inf
+                }
+        analysis["shortest_paths"] = shortest_paths
+        return analysis
+
+    def _serialize_graph(self, graph: EdgeListGraph) -> Dict[str, Any]:
+        """Serialize an edge-list graph to JSON-serializable format"""
+        return {
+            "nodes": list(self._iter_serialized_nodes(graph)),
+            "edges": list(self._iter_serialized_edges(graph)),
+            "metrics": self._graph_metrics(graph),
+        }
+
+    def serialize_to(self, graph: EdgeListGraph, fp: TextIO):
+        """Stream the serialized graph as JSON to fp, one node or edge at a time"""
+        encode = json.JSONEncoder().encode
+        fp.write('{"nodes": [')
+        self._write_json_items(fp, self._iter_serialized_nodes(graph), encode)
+        fp.write('], "edges": [')
+        self._write_json_items(fp, self._iter_serialized_edges(graph), encode)
+        fp.write('], "metrics": ')
+        fp.write(encode(self._graph_metrics(graph)))
+        fp.write("}")
+
+    @staticmethod
+    def _write_json_items(fp: TextIO, items, encode):
+        """Write comma-separated JSON values without building an intermediate list"""
+        for i, item in enumerate(items):
+            if i:
+                fp.write(", ")
+            fp.write(encode(item))
+
+    def _iter_serialized_nodes(self, graph: EdgeListGraph):
+        """Yield node dicts in insertion order"""
+        for node, data in graph.nodes.items():
+            yield {"id": node, "label": node, **data}
+
+    def _iter_serialized_edges(self, graph: EdgeListGraph):
+        """Yield edge dicts in insertion order"""
+        for (source, target), data in graph.edges.items():
+            yield {"source": source, "target": target, **data}
+
+    def _graph_metrics(self, graph: EdgeListGraph) -> Dict[str, Any]:
+        """Summary metrics reported alongside every serialized graph"""
+        return {
+            "node_count": len(graph.nodes),
+            "edge_count": len(graph.edges),
+            "density": graph.density(),
+            "is_connected": graph.is_weakly_connected(),
         }
 
+    def _count_lines(self, file_obj: SourceFile) -> int:
+        """Count source lines without building a list of line strings (memoized)"""
+        key = id(file_obj)
+        lines = self.line_count_cache.get(key)
+        if lines is None:
+            source = file_obj.source if hasattr(file_obj, "source") else ""
+            # Same result as len(source.splitlines()) for newline-delimited text
+            lines = source.count("\n") + (not source.endswith("\n")) if source else 0
+            self.line_count_cache[key] = lines
+        return lines
+
     # Re-implement helper functions from AnalysisEngine that are used by VisualizationEngine
     # These are simplified versions, assuming they would be part of the main AnalysisEngine
     def _calculate_function_complexity(self, func: Function) -> int:
-        """Calculate cyclomatic complexity for a function (simplified)"""
+        """Calculate cyclomatic complexity for a function (simplified, memoized)"""
+        key = id(func)
+        complexity = self.complexity_cache.get(key)
+        if complexity is not None:
+            return complexity
+
         if hasattr(func, "complexity"):  # If graph-sitter provides it directly
-            return func.complexity
-        if hasattr(func, "source") and func.source:
-            return (
-                func.source.count("if ")
-                + func.source.count("for ")
-                + func.source.count("while ")
-                + 1
+            complexity = func.complexity
+        elif hasattr(func, "source") and func.source:
+            source = func.source
+            complexity = (
+                source.count("if ") + source.count("for ") + source.count("while ") + 1
             )
-        return 1
+        else:
+            complexity = 1
+
+        self.complexity_cache[key] = complexity
+        return complexity
 
 
 # ============================================================================
 # TRANSFORMATION ENGINE
 # ============================================================================
 
+# Oldest transformation log entries are dropped beyond this many
+TRANSFORMATION_LOG_LIMIT = 10_000
+
+# Line boundaries recognised by str.splitlines() besides "\n"
+OTHER_LINE_BREAKS = ("\r", "\v", "\f", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029")
+
+# A fix that starts like a whole module replaces the file: a shebang, or an
+# unindented import after only blank/comment lines and an optional module docstring
+FULL_FILE_FIX_PATTERN = re.compile(
+    r"#!"
+    r"|(?:[ \t]*(?:#[^\n]*)?\n)*"
+    r"(?:[rRuU]?(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?''')[ \t]*\n(?:[ \t]*(?:#[^\n]*)?\n)*)?"
+    r"(?:from|import)\s"
+)
+
+
+def slice_source_lines(source: str, start_line: int, end_line: int) -> Optional[str]:
+    """
+    Join 1-based lines start_line..end_line of source, or return None when the
+    range is invalid. Matches splitlines() slicing, but only splits up to
+    end_line so the rest of a large file is never copied into a list.
+    """
+    if end_line < start_line or any(brk in source for brk in OTHER_LINE_BREAKS):
+        source_lines = source.splitlines()
+        if start_line < 1 or end_line > len(source_lines):
+            return None
+        return "\n".join(source_lines[start_line - 1 : end_line])
+
+    if start_line < 1:
+        return None
+    # The last part holds the unsplit remainder after end_line lines
+    parts = source.split("\n", end_line)
+    if len(parts) < end_line or (len(parts) == end_line and not parts[-1]):
+        return None
+    return "\n".join(parts[start_line - 1 : end_line])
+
+
+def is_valid_symbol_name(name: str) -> bool:
+    """Identifier check in one C call; "$" is allowed for JavaScript/TypeScript names"""
+    return isinstance(name, str) and name.replace("$", "_").isidentifier()
+
+
+@dataclass(frozen=True, slots=True)
+class TransformationLogEntry:
+    """
+    Compact transformation log record: a tuple of values plus a key tuple
+    shared by every entry with the same result shape.
+    """
+
+    keys: Tuple[str, ...]
+    values: Tuple[Any, ...]
+
+    _key_shapes = {}  # Class-level (not a slot): canonical key tuples by shape
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "TransformationLogEntry":
+        keys = tuple(result)
+        return cls(cls._key_shapes.setdefault(keys, keys), tuple(result.values()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self.keys, self.values))
+
+
+@dataclass(frozen=True, slots=True)
+class TransformationFailure:
+    """Expected failure returned by a transformation instead of raising it"""
+
+    error: str
+    error_type: str = "ValueError"
+
+
+def log_transformation(**error_fields: str):
+    """
+    Wrap a TransformationEngine method so successful results and failures are
+    appended to the transformation log. error_fields maps keys of the error
+    result to the names of the arguments whose values they report.
+    """
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        def log_error(self, args, kwargs, error: str, error_type: str) -> Dict[str, Any]:
+            arguments = signature.bind_partial(self, *args, **kwargs)
+            arguments.apply_defaults()
+            error_result = {"success": False}
+            for key, arg_name in error_fields.items():
+                error_result[key] = arguments.arguments.get(arg_name)
+            error_result["error"] = error
+            error_result["error_type"] = error_type
+            self.transformation_log.append(TransformationLogEntry.from_result(error_result))
+            return error_result
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                result = method(self, *args, **kwargs)
+            except Exception as e:
+                return log_error(self, args, kwargs, str(e), type(e).__name__)
+
+            # Expected failures skip the raise/catch and traceback capture
+            if isinstance(result, TransformationFailure):
+                return log_error(self, args, kwargs, result.error, result.error_type)
+
+            # Rejections returned without raising (e.g. safe mode) are not logged
+            if result.get("success"):
+                self.transformation_log.append(TransformationLogEntry.from_result(result))
+            return result
+
+        return wrapper
+
+    return decorator
+
 
 class TransformationEngine:
     """Advanced transformation engine for code modifications."""
 
-    def __init__(self, codebase: Codebase):
+    def __init__(self, codebase: Codebase, log_limit: int = TRANSFORMATION_LOG_LIMIT):
         self.codebase = codebase
-        self.transformation_log = []
+        self.transformation_log: deque[TransformationLogEntry] = deque(maxlen=log_limit)
 
+    @log_transformation(symbol="symbol_name")
     def move_symbol(
         self,
         symbol_name: str,
@@ -4361,161 +5354,117 @@ class TransformationEngine:
         strategy: str = "update_all_imports",
     ) -> Dict[str, Any]:
         """Move a symbol to a different file"""
-        try:
-            symbol = self.codebase.get_symbol(symbol_name)
-            if not symbol:
-                raise ValueError(f"Symbol '{symbol_name}' not found")
-
-            # Get or create target file
-            if not self.codebase.has_file(target_file):
-                target_file_obj = self.codebase.create_file(target_file)
-            else:
-                target_file_obj = self.codebase.get_file(target_file)
-
-            # Record original location
-            original_file = symbol.filepath
+        symbol = self.codebase.get_symbol(symbol_name)
+        if not symbol:
+            return TransformationFailure(f"Symbol '{symbol_name}' not found")
 
-            # Perform the move
-            symbol.move_to_file(
-                target_file_obj,
-                include_dependencies=include_dependencies,
-                strategy=strategy,
-            )
+        # Get or create target file
+        if not self.codebase.has_file(target_file):
+            target_file_obj = self.codebase.create_file(target_file)
+        else:
+            target_file_obj = self.codebase.get_file(target_file)
 
-            result = {
-                "success": True,
-                "symbol": symbol_name,
-                "from_file": original_file,
-                "to_file": target_file,
-                "strategy": strategy,
-                "include_dependencies": include_dependencies,
-            }
+        # Record original location
+        original_file = symbol.filepath
 
-            self.transformation_log.append(result)
-            return result
+        # Perform the move
+        symbol.move_to_file(
+            target_file_obj,
+            include_dependencies=include_dependencies,
+            strategy=strategy,
+        )
 
-        except Exception as e:
-            error_result = {
-                "success": False,
-                "symbol": symbol_name,
-                "error": str(e),
-                "error_type": type(e).__name__,
-            }
-            self.transformation_log.append(error_result)
-            return error_result
+        return {
+            "success": True,
+            "symbol": symbol_name,
+            "from_file": original_file,
+            "to_file": target_file,
+            "strategy": strategy,
+            "include_dependencies": include_dependencies,
+        }
 
+    @log_transformation(symbol="symbol_name")
     def remove_symbol(self, symbol_name: str, safe_mode: bool = True) -> Dict[str, Any]:
         """Remove a symbol from the codebase"""
-        try:
-            symbol = self.codebase.get_symbol(symbol_name)
-            if not symbol:
-                raise ValueError(f"Symbol '{symbol_name}' not found")
-
-            # Check if symbol is used elsewhere
-            if safe_mode and len(symbol.usages) > 0:
+        symbol = self.codebase.get_symbol(symbol_name)
+        if not symbol:
+            return TransformationFailure(f"Symbol '{symbol_name}' not found")
+
+        # Check if symbol is used elsewhere, touching at most the five usages reported
+        if safe_mode:
+            reported_usages = [usage.file.filepath for usage in islice(symbol.usages, 5)]
+            if reported_usages:
                 return {
                     "success": False,
                     "symbol": symbol_name,
                     "error": "Symbol is still in use",
-                    "usages": [usage.file.filepath for usage in symbol.usages[:5]],
+                    "usages": reported_usages,
                 }
 
-            # Remove the symbol
-            original_file = symbol.filepath
-            symbol.remove()
-
-            result = {
-                "success": True,
-                "symbol": symbol_name,
-                "file": original_file,
-                "safe_mode": safe_mode,
-            }
-
-            self.transformation_log.append(result)
-            return result
+        # Remove the symbol
+        original_file = symbol.filepath
+        symbol.remove()
 
-        except Exception as e:
-            error_result = {
-                "success": False,
-                "symbol": symbol_name,
-                "error": str(e),
-                "error_type": type(e).__name__,
-            }
-            self.transformation_log.append(error_result)
-            return error_result
+        return {
+            "success": True,
+            "symbol": symbol_name,
+            "file": original_file,
+            "safe_mode": safe_mode,
+        }
 
+    @log_transformation(old_name="old_name", new_name="new_name")
     def rename_symbol(self, old_name: str, new_name: str) -> Dict[str, Any]:
         """Rename a symbol and update all references"""
-        try:
-            symbol = self.codebase.get_symbol(old_name)
-            if not symbol:
-                raise ValueError(f"Symbol '{old_name}' not found")
-
-            # Count usages before rename
-            usage_count = len(symbol.usages)
-
-            # Perform the rename
-            symbol.rename(new_name)
-
-            result = {
-                "success": True,
-                "old_name": old_name,
-                "new_name": new_name,
-                "file": symbol.filepath,
-                "usages_updated": usage_count,
-            }
+        if not is_valid_symbol_name(new_name):
+            return TransformationFailure(f"Invalid symbol name '{new_name}'")
+        symbol = self.codebase.get_symbol(old_name)
+        if not symbol:
+            return TransformationFailure(f"Symbol '{old_name}' not found")
+        filepath = symbol.filepath
 
-            self.transformation_log.append(result)
-            return result
+        # Count usages before rename
+        usage_count = len(symbol.usages)
 
-        except Exception as e:
-            error_result = {
-                "success": False,
-                "old_name": old_name,
-                "new_name": new_name,
-                "error": str(e),
-                "error_type": type(e).__name__,
-            }
-            self.transformation_log.append(error_result)
-            return error_result
+        # Perform the rename
+        symbol.rename(new_name)
 
+        return {
+            "success": True,
+            "old_name": old_name,
+            "new_name": new_name,
+            "file": filepath,
+            "usages_updated": usage_count,
+        }
+
+    @log_transformation(file="file_path")
     def resolve_imports(self, file_path: str) -> Dict[str, Any]:
         """Resolve and fix import issues in a file"""
-        try:
-            file_obj = self.codebase.get_file(file_path)
-            if not file_obj:
-                raise ValueError(f"File '{file_path}' not found")
+        file_obj = self.codebase.get_file(file_path)
+        if not file_obj:
+            return TransformationFailure(f"File '{file_path}' not found")
 
-            resolved_imports = []
-            unresolved_imports = []
+        resolved_imports = []
+        unresolved_imports = []
+        append_resolved = resolved_imports.append
+        append_unresolved = unresolved_imports.append
 
-            for imp in file_obj.imports:
-                if hasattr(imp, "resolved_symbol") and imp.resolved_symbol:
-                    resolved_imports.append(imp.name)
-                else:
-                    unresolved_imports.append(imp.name)
-
-            result = {
-                "success": True,
-                "file": file_path,
-                "resolved_imports": resolved_imports,
-                "unresolved_imports": unresolved_imports,
-                "total_imports": len(file_obj.imports),
-            }
-
-            self.transformation_log.append(result)
-            return result
+        # A single partitioning pass; building flag masks for itertools.compress
+        # or NumPy needs extra passes over the imports and measured slower
+        for imp in file_obj.imports:
+            if getattr(imp, "resolved_symbol", None):
+                append_resolved(imp.name)
+            else:
+                append_unresolved(imp.name)
 
-        except Exception as e:
-            error_result = {
-                "success": False,
-                "file": file_path,
-                "error": str(e),
-                "error_type": type(e).__name__,
-            }
-            self.transformation_log.append(error_result)
-            return error_result
+        return {
+            "success": True,
+            "file": file_path,
+            "resolved_imports": resolved_imports,
+            "unresolved_imports": unresolved_imports,
+            "total_imports": len(resolved_imports) + len(unresolved_imports),
+        }
 
+    @log_transformation(function="symbol_name")
     def add_type_annotations(
         self,
         symbol_name: str,
@@ -4523,46 +5472,38 @@ class TransformationEngine:
         parameter_types: Optional[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
         """Add type annotations to a function"""
-        try:
-            symbol = self.codebase.get_function(symbol_name)
-            if not symbol:
-                raise ValueError(f"Function '{symbol_name}' not found")
-
-            changes = []
-
-            # Add return type annotation
-            if return_type:
-                symbol.set_return_type(return_type)
-                changes.append(f"Added return type: {return_type}")
-
-            # Add parameter type annotations
-            if parameter_types:
-                for param_name, param_type in parameter_types.items():
-                    param = symbol.get_parameter(param_name)
-                    if param:
-                        param.set_type(param_type)  # Changed from set_type_annotation
-                        changes.append(f"Added type for {param_name}: {param_type}")
-
-            result = {
-                "success": True,
-                "function": symbol_name,
-                "file": symbol.filepath,
-                "changes": changes,
-            }
-
-            self.transformation_log.append(result)
-            return result
+        symbol = self.codebase.get_function(symbol_name)
+        if not symbol:
+            return TransformationFailure(f"Function '{symbol_name}' not found")
+        filepath = symbol.filepath
+
+        changes = []
+
+        # Add return type annotation
+        if return_type:
+            symbol.set_return_type(return_type)
+            changes.append(f"Added return type: {return_type}")
+
+        # Add parameter type annotations, indexing parameters once instead of
+        # scanning the signature for every annotated name
+        if parameter_types:
+            params_by_name = {param.name: param for param in symbol.parameters}
+            for param_name, param_type in parameter_types.items():
+                param = params_by_name.get(param_name)
+                if param:
+                    param.set_type(param_type)  # Changed from set_type_annotation
+                    changes.append(f"Added type for {param_name}: {param_type}")
 
-        except Exception as e:
-            error_result = {
-                "success": False,
-                "function": symbol_name,
-                "error": str(e),
-                "error_type": type(e).__name__,
-            }
-            self.transformation_log.append(error_result)
-            return error_result
+        return {
+            "success": True,
+            "function": symbol_name,
+            "file": filepath,
+            "changes": changes,
+        }
 
+    @log_transformation(
+        source_function="source_function", new_function="new_function_name"
+    )
     def extract_function(
         self,
         source_function: str,
@@ -4571,133 +5512,131 @@ class TransformationEngine:
         end_line: int,
     ) -> Dict[str, Any]:
         """Extract code into a new function"""
-        try:
-            func = self.codebase.get_function(source_function)
-            if not func:
-                raise ValueError(f"Function '{source_function}' not found")
-
-            # Get source lines
-            source_lines = func.source.splitlines()
-            if start_line < 1 or end_line > len(source_lines):
-                raise ValueError("Invalid line range")
-
-            # Extract the code block
-            extracted_code = "\n".join(source_lines[start_line - 1 : end_line])
-
-            # Create new function
-            new_function_code = f"""
+        func = self.codebase.get_function(source_function)
+        if not func:
+            return TransformationFailure(f"Function '{source_function}' not found")
+        filepath = func.filepath
+
+        # Extract the code block
+        extracted_code = slice_source_lines(func.source, start_line, end_line)
+        if extracted_code is None:
+            return TransformationFailure("Invalid line range")
+
+        # Create new function
+        new_function_code = f"""
 def {new_function_name}():
     {extracted_code}
 """
 
-            # Add new function after the original
-            # This is a placeholder; graph-sitter's API for code modification is more advanced
-            # func.insert_after(new_function_code)
-
-            # Replace extracted code with function call
-            replacement = f"{new_function_name}()"
-            # This is a simplified replacement - in practice, you'd need more sophisticated logic
-
-            result = {
-                "success": True,
-                "source_function": source_function,
-                "new_function": new_function_name,
-                "extracted_lines": f"{start_line}-{end_line}",
-                "file": func.filepath,
-            }
+        # Add new function after the original
+        # This is a placeholder; graph-sitter's API for code modification is more advanced
+        # func.insert_after(new_function_code)
 
-            self.transformation_log.append(result)
-            return result
+        # Replace extracted code with function call
+        replacement = f"{new_function_name}()"
+        # This is a simplified replacement - in practice, you'd need more sophisticated logic
 
-        except Exception as e:
-            error_result = {
-                "success": False,
-                "source_function": source_function,
-                "new_function": new_function_name,
-                "error": str(e),
-                "error_type": type(e).__name__,
-            }
-            self.transformation_log.append(error_result)
-            return error_result
+        return {
+            "success": True,
+            "source_function": source_function,
+            "new_function": new_function_name,
+            "extracted_lines": f"{start_line}-{end_line}",
+            "file": filepath,
+        }
 
     def get_transformation_log(self) -> List[Dict[str, Any]]:
-        """Get the log of all transformations performed"""
-        return self.transformation_log.copy()
+        """Get the log of the most recent transformations performed"""
+        return [entry.to_dict() for entry in self.transformation_log]
 
     def clear_transformation_log(self):
         """Clear the transformation log"""
         self.transformation_log.clear()
 
 
-class EnhancedTransformationEngine(TransformationEngine):
-    """Enhanced transformation engine with comprehensive resolution methods"""
+# Placeholder resolvers: method name -> (subject of the response message, docstring).
+# These would need to be implemented to use graph-sitter's transformation APIs.
+PLACEHOLDER_RESOLVERS = {
+    "_resolve_all_types": (
+        "all types",
+        "Automated resolution for all missing/incorrect types.",
+    ),
+    "_resolve_all_imports": (
+        "all imports",
+        "Automated resolution for all import issues (unused, unresolved, circular).",
+    ),
+    "_resolve_all_function_calls": (
+        "all function calls",
+        "Automated resolution for all function call issues (missing args, type mismatches).",
+    ),
+    "_resolve_method_implementations": (
+        "method implementations",
+        "Automated resolution for unimplemented methods.",
+    ),
+    "_resolve_class_attributes": (
+        "class attributes",
+        "Automated resolution for missing class attributes.",
+    ),
+    "_resolve_variable_definitions": (
+        "variable definitions",
+        "Automated resolution for undefined variable usages.",
+    ),
+    "_resolve_parameter_types": (
+        "parameter types",
+        "Automated resolution for missing parameter types.",
+    ),
+    "_resolve_argument_types": (
+        "argument types",
+        "Automated resolution for argument type mismatches.",
+    ),
+}
+
+
+def with_placeholder_resolvers(cls):
+    """Class decorator adding the PLACEHOLDER_RESOLVERS methods to cls"""
+
+    def make_resolver(method_name: str, subject: str, doc: str):
+        # Built once per method; read-only so callers cannot alter the shared response
+        response = MappingProxyType(
+            {"status": "success", "message": f"Attempted to resolve {subject}."}
+        )
 
-    def __init__(self, codebase: Codebase):
-        super().__init__(codebase)
-        self.resolution_methods = {
-            # These methods would need to be implemented to use graph-sitter's transformation APIs
-            "resolve_all_types": self._resolve_all_types,
-            "resolve_all_imports": self._resolve_all_imports,
-            "resolve_all_function_calls": self._resolve_all_function_calls,
-            "resolve_method_implementations": self._resolve_method_implementations,
-            "resolve_class_attributes": self._resolve_class_attributes,
-            "resolve_variable_definitions": self._resolve_variable_definitions,
-            "resolve_parameter_types": self._resolve_parameter_types,
-            "resolve_argument_types": self._resolve_argument_types,
-        }
+        def resolver(self) -> Mapping[str, Any]:
+            return response
 
-    def _resolve_all_types(self) -> Dict[str, Any]:
-        """Automated resolution for all missing/incorrect types."""
-        # Placeholder for actual graph-sitter type resolution logic
-        return {"status": "success", "message": "Attempted to resolve all types."}
+        resolver.__name__ = method_name
+        resolver.__qualname__ = f"{cls.__qualname__}.{method_name}"
+        resolver.__doc__ = doc
+        return resolver
 
-    def _resolve_all_imports(self) -> Dict[str, Any]:
-        """Automated resolution for all import issues (unused, unresolved, circular)."""
-        # Placeholder for actual graph-sitter import resolution logic
-        return {"status": "success", "message": "Attempted to resolve all imports."}
+    for method_name, (subject, doc) in PLACEHOLDER_RESOLVERS.items():
+        setattr(cls, method_name, make_resolver(method_name, subject, doc))
+    return cls
 
-    def _resolve_all_function_calls(self) -> Dict[str, Any]:
-        """Automated resolution for all function call issues (missing args, type mismatches)."""
-        # Placeholder for actual graph-sitter function call resolution logic
-        return {
-            "status": "success",
-            "message": "Attempted to resolve all function calls.",
-        }
 
-    def _resolve_method_implementations(self) -> Dict[str, Any]:
-        """Automated resolution for unimplemented methods."""
-        # Placeholder for actual graph-sitter method implementation logic
-        return {
-            "status": "success",
-            "message": "Attempted to resolve method implementations.",
-        }
+@with_placeholder_resolvers
+class EnhancedTransformationEngine(TransformationEngine):
+    """Enhanced transformation engine with comprehensive resolution methods"""
 
-    def _resolve_class_attributes(self) -> Dict[str, Any]:
-        """Automated resolution for missing class attributes."""
-        # Placeholder for actual graph-sitter class attribute logic
-        return {
-            "status": "success",
-            "message": "Attempted to resolve class attributes.",
-        }
+    # Resolution names mapped to method names; built once with the class
+    RESOLUTION_METHODS = {
+        "resolve_all_types": "_resolve_all_types",
+        "resolve_all_imports": "_resolve_all_imports",
+        "resolve_all_function_calls": "_resolve_all_function_calls",
+        "resolve_method_implementations": "_resolve_method_implementations",
+        "resolve_class_attributes": "_resolve_class_attributes",
+        "resolve_variable_definitions": "_resolve_variable_definitions",
+        "resolve_parameter_types": "_resolve_parameter_types",
+        "resolve_argument_types": "_resolve_argument_types",
+    }
 
-    def _resolve_variable_definitions(self) -> Dict[str, Any]:
-        """Automated resolution for undefined variable usages."""
-        # Placeholder for actual graph-sitter variable definition logic
+    @cached_property
+    def resolution_methods(self) -> Dict[str, Any]:
+        """Resolution names mapped to bound methods, bound on first access"""
         return {
-            "status": "success",
-            "message": "Attempted to resolve variable definitions.",
+            name: getattr(self, method_name)
+            for name, method_name in self.RESOLUTION_METHODS.items()
         }
 
-    def _resolve_parameter_types(self) -> Dict[str, Any]:
-        """Automated resolution for missing parameter types."""
-        # Placeholder for actual graph-sitter parameter type logic
-        return {"status": "success", "message": "Attempted to resolve parameter types."}
-
-    def _resolve_argument_types(self) -> Dict[str, Any]:
-        """Automated resolution for argument type mismatches."""
-        # Placeholder for actual graph-sitter argument type logic
-        return {"status": "success", "message": "Attempted to resolve argument types."}
-
 
 # ============================================================================
 # API ENDPOINTS
@@ -4710,41 +5649,60 @@ async def analyze_codebase(request: AnalyzeRequest, background_tasks: Background
     try:
         analysis_id = str(uuid.uuid4())
 
-        # Clone repository
-        repo_path = clone_repository(request.repo_url, request.branch)
-
-        # Initialize AnalysisEngine
-        codebase = Codebase(
-            repo_path,
-            config=CodebaseConfig(
-                method_usages=True,
-                generics=True,
-                sync_enabled=True,
-                full_range_index=True,
-                py_resolve_syspath=True,
-                exp_lazy_graph=False,
-            ),
+        # Reuse the clone and analysis of a commit that was already analyzed
+        head_sha = await asyncio.to_thread(
+            resolve_remote_head, request.repo_url, request.branch
         )
-        analysis_engine = AnalysisEngine(codebase, request.language)
+        cache_key = (request.repo_url, request.branch, head_sha)
+        # Concurrent requests for one commit wait for a single clone and analysis
+        lock = analysis_cache_locks[cache_key] if head_sha else asyncio.Lock()
+        try:
+            async with lock:
+                cached = get_cached_analysis(cache_key) if head_sha else None
+                if cached is None:
+                    # Clone repository
+                    repo_path = await asyncio.to_thread(
+                        clone_repository, request.repo_url, request.branch
+                    )
+
+                    # Initialize AnalysisEngine
+                    codebase = await asyncio.to_thread(build_codebase, repo_path)
+                    analysis_engine = AnalysisEngine(codebase, request.language)
+
+                    # Perform analysis
+                    analysis_result = await analysis_engine.perform_full_analysis()
+
+                    if head_sha:
+                        store_cached_analysis(cache_key, {
+                            "repo_path": repo_path,
+                            "analysis": analysis_result,
+                        })
+                    # Keep the freshly parsed codebase for follow-up requests
+                    remember_session_codebase(analysis_id, codebase)
+                else:
+                    logger.info(f"Reusing analysis of {request.repo_url}@{head_sha}")
+                    repo_path = cached["repo_path"]
+                    analysis_result = cached["analysis"]
+        finally:
+            if cache_key not in analysis_cache:
+                analysis_cache_locks.pop(cache_key, None)
 
-        # Perform analysis
-        analysis_result = await analysis_engine.perform_full_analysis()
+        # Schedule cleanup; a shared clone is kept until its last session expires
+        background_tasks.add_task(cleanup_temp_directory, repo_path)
 
         # Store analysis session
         analysis_sessions[analysis_id] = {
             "id": analysis_id,
             "repo_url": request.repo_url,
             "branch": request.branch,
+            "language": request.language,
             "repo_path": repo_path,
-            "codebase_obj": codebase,  # Store codebase object for later use
-            "analysis": analysis_result,
+            "analysis": copy_session_analysis(analysis_result),
             "created_at": datetime.now().isoformat(),
+            "clone_expires_at": time.monotonic() + CLEANUP_DELAY,
             "config": request.config or {},
         }
 
-        # Schedule cleanup
-        background_tasks.add_task(cleanup_temp_directory, repo_path)
-
         return {
             "analysis_id": analysis_id,
             "status": "completed",
@@ -4755,23 +5713,37 @@ async def analyze_codebase(request: AnalyzeRequest, background_tasks: Background
                 "errors": analysis_result["error_analysis"]["total"],
                 "dead_code_items": analysis_result["dead_code_analysis"]["total"],
             },
-            "analysis": analysis_result,
+            # Details are served by the per-aspect endpoints
+            "links": {
+                "summary": f"/analysis/{analysis_id}/summary",
+                "errors": f"/analysis/{analysis_id}/errors",
+                "dead_code": f"/analysis/{analysis_id}/dead-code",
+                "entrypoints": f"/analysis/{analysis_id}/entrypoints",
+                "quality": f"/analysis/{analysis_id}/quality",
+                "tree": f"/analysis/{analysis_id}/tree",
+                "dependencies": f"/analysis/{analysis_id}/dependencies",
+                "architecture": f"/analysis/{analysis_id}/architecture",
+            },
         }
 
     except Exception as e:
-        logger.error(f"Analysis failed: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"Analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
 @app.get("/analysis/{analysis_id}/errors", response_model=ErrorAnalysisResponse)
-async def get_error_analysis(analysis_id: str):
-    """Get detailed error analysis for a codebase"""
+async def get_error_analysis(
+    analysis_id: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0
+):
+    """Get detailed error analysis for a codebase, one page of errors at a time"""
     if analysis_id not in analysis_sessions:
         raise HTTPException(status_code=404, detail="Analysis not found")
+    check_page(limit, offset)
 
     session = analysis_sessions[analysis_id]
     error_analysis = session["analysis"]["error_analysis"]
+    detailed_errors = error_analysis["detailed_errors"]
+    end = offset + limit
 
     return ErrorAnalysisResponse(
         total_errors=error_analysis["total"],
@@ -4779,9 +5751,10 @@ async def get_error_analysis(analysis_id: str):
         major_errors=error_analysis["major"],
         minor_errors=error_analysis["minor"],
         errors_by_category=error_analysis["by_category"],
-        detailed_errors=error_analysis["detailed_errors"],
+        detailed_errors=detailed_errors[offset:end],
         error_patterns=error_analysis.get("error_patterns", []),
         suggestions=error_analysis.get("suggestions", []),
+        next_offset=end if end < len(detailed_errors) else None,
     )
 
 
@@ -4795,27 +5768,36 @@ async def fix_errors_with_ai(analysis_id: str, max_fixes: int = 1):
         raise HTTPException(status_code=404, detail="Analysis not found")
 
     session = analysis_sessions[analysis_id]
-    codebase: Codebase = session["codebase_obj"]  # Retrieve codebase object
-    repo_path = session["repo_path"]
     error_analysis = session["analysis"]["error_analysis"]
 
     if not error_analysis["detailed_errors"]:
         return {"message": "No errors found to fix."}
 
+    codebase = await get_writable_session_codebase(analysis_id)
+    repo_path = session["repo_path"]
+
     fixes_applied = 0
     fix_results = []
+    fixed_files: Dict[str, str] = {}
+    # First detailed error at each (file, line), for marking applied fixes
+    errors_by_location: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for err in error_analysis["detailed_errors"]:
+        errors_by_location.setdefault((err["file"], err["line"]), err)
 
     # Sort diagnostics by severity (critical > major > minor), then by file path, then by line number
     # Assuming severity is 'critical', 'major', 'minor' for sorting
+    # The loop usually stops after max_fixes, so pop errors off a heap in that
+    # order instead of sorting them all; the index keeps ties in list order.
     severity_order = {"critical": 0, "major": 1, "minor": 2, "unknown": 3}
-    sorted_errors = sorted(
-        error_analysis["detailed_errors"],
-        key=lambda ed: (severity_order.get(ed["severity"], 3), ed["file"], ed["line"]),
-    )
+    detailed_errors = error_analysis["detailed_errors"]
+    error_heap = [
+        (severity_order.get(ed["severity"], 3), ed["file"], ed["line"], i)
+        for i, ed in enumerate(detailed_errors)
+    ]
+    heapq.heapify(error_heap)
 
-    for error_data in sorted_errors:
-        if fixes_applied >= max_fixes:
-            break
+    while error_heap and fixes_applied < max_fixes:
+        error_data = detailed_errors[heapq.heappop(error_heap)[-1]]
 
         # Only attempt to fix LSP diagnostics for now, as they have the full Diagnostic object
         # The 'context' field now holds the full EnhancedDiagnostic object
@@ -4843,7 +5825,7 @@ async def fix_errors_with_ai(analysis_id: str, max_fixes: int = 1):
         ai_fix_response = resolve_diagnostic_with_ai(enhanced_diag, codebase)
 
         if ai_fix_response["status"] == "success":
-            original_content = Path(file_path_abs).read_text()
+            original_content = await asyncio.to_thread(Path(file_path_abs).read_text)
             fixed_content = apply_fix_to_file(
                 file_path_abs,
                 original_content,
@@ -4852,7 +5834,7 @@ async def fix_errors_with_ai(analysis_id: str, max_fixes: int = 1):
             )
 
             try:
-                Path(file_path_abs).write_text(fixed_content)
+                await asyncio.to_thread(Path(file_path_abs).write_text, fixed_content)
                 fixes_applied += 1
                 fix_results.append(
                     {
@@ -4866,44 +5848,21 @@ async def fix_errors_with_ai(analysis_id: str, max_fixes: int = 1):
                     f"Successfully applied fix to {enhanced_diag['relative_file_path']}. Explanation: {ai_fix_response['explanation']}"
                 )
 
-                # Re-analyze the codebase after applying fixes to update diagnostics
-                # This is crucial for iterative fixing
-                # For simplicity, we'll just update the in-memory codebase object
-                codebase.reload()  # Reload the codebase to reflect changes
-                # Re-run LSP diagnostics for the modified file
-                # This requires re-initializing LSP manager for the current codebase state
-                lsp_manager_temp = LSPDiagnosticsManager(
-                    codebase, Language(session["language"])
-                )
-                lsp_manager_temp.start_server()
-                lsp_manager_temp.open_file(
-                    enhanced_diag["relative_file_path"], fixed_content
-                )
-                await asyncio.sleep(1)  # Give LSP time to re-diagnose
-                updated_diags_for_file = lsp_manager_temp.get_diagnostics(
-                    enhanced_diag["relative_file_path"]
-                )
-                lsp_manager_temp.shutdown_server()
+                # Keep only the latest content per file; the codebase and LSP
+                # are refreshed once after all fixes are applied
+                fixed_files[enhanced_diag["relative_file_path"]] = fixed_content
 
                 # Update the session's analysis with new diagnostics
                 # This is a simplified update; a full re-analysis might be needed for accuracy
                 # Find the original enhanced diagnostic in the session's analysis and update it
-                for i, err in enumerate(
-                    session["analysis"]["error_analysis"]["detailed_errors"]
-                ):
-                    if (
-                        err["file"] == enhanced_diag["relative_file_path"]
-                        and err["line"] == diag.range.line + 1
-                    ):
-                        # For simplicity, we'll just mark it as fixed or remove it.
-                        # A more robust solution would re-run the full error analysis.
-                        session["analysis"]["error_analysis"]["detailed_errors"][i][
-                            "status"
-                        ] = "fixed"
-                        session["analysis"]["error_analysis"]["detailed_errors"][i][
-                            "fixed_code"
-                        ] = ai_fix_response["fixed_code"]
-                        break
+                original_error = errors_by_location.get(
+                    (enhanced_diag["relative_file_path"], diag.range.line + 1)
+                )
+                if original_error is not None:
+                    # For simplicity, we'll just mark it as fixed or remove it.
+                    # A more robust solution would re-run the full error analysis.
+                    original_error["status"] = "fixed"
+                    original_error["fixed_code"] = ai_fix_response["fixed_code"]
 
             except Exception as e:
                 fix_results.append(
@@ -4928,8 +5887,41 @@ async def fix_errors_with_ai(analysis_id: str, max_fixes: int = 1):
                 f"AI failed to fix error: {ai_fix_response.get('message', 'Unknown error')}"
             )
 
+    if fixed_files:
+        # Re-analyze the codebase after applying fixes to update diagnostics
+        # For simplicity, we'll just update the in-memory codebase object
+        codebase.reload()  # Reload the codebase to reflect changes
+        forget_import_graph(codebase)
+        forget_session_docs(session)
+        if "viz_engine" in session:
+            session["viz_engine"].refresh()
+        # Re-run LSP diagnostics for the modified files on the session's warm server
+        lsp_server = get_session_lsp_server(analysis_id, codebase)
+        lsp_manager = lsp_server["manager"]
+        previous_diags = {}
+        for relative_file_path, fixed_content in fixed_files.items():
+            previous_diags[relative_file_path] = list(
+                lsp_manager.get_diagnostics(relative_file_path)
+            )
+            if relative_file_path in lsp_server["open_files"]:
+                lsp_manager.change_file(relative_file_path, fixed_content)
+            else:
+                lsp_manager.open_file(relative_file_path, fixed_content)
+                lsp_server["open_files"].add(relative_file_path)
+        # Give LSP up to two seconds per file to re-publish diagnostics for the new content
+        updated_diags = await asyncio.gather(
+            *(
+                lsp_manager.wait_for_diagnostics(relative_file_path, previous)
+                for relative_file_path, previous in previous_diags.items()
+            )
+        )
+        for relative_file_path, updated_diags_for_file in zip(previous_diags, updated_diags):
+            logger.info(
+                f"{relative_file_path} has {len(updated_diags_for_file)} diagnostics after fixes"
+            )
+
     return {
-        "message": f"Attempted to fix {len(sorted_errors)} errors. Applied {fixes_applied} fixes.",
+        "message": f"Attempted to fix {len(detailed_errors)} errors. Applied {fixes_applied} fixes.",
         "fix_results": fix_results,
     }
 
@@ -4960,38 +5952,39 @@ async def get_entrypoint_analysis(analysis_id: str):
 
 
 @app.get("/analysis/{analysis_id}/dead-code", response_model=DeadCodeAnalysisResponse)
-async def get_dead_code_analysis(analysis_id: str):
-    """Get dead code analysis for a codebase"""
+async def get_dead_code_analysis(
+    analysis_id: str, limit: int = DEFAULT_PAGE_SIZE, offset: int = 0
+):
+    """Get dead code analysis for a codebase, one page of each item list at a time"""
     if analysis_id not in analysis_sessions:
         raise HTTPException(status_code=404, detail="Analysis not found")
+    check_page(limit, offset)
 
     session = analysis_sessions[analysis_id]
     dead_code_analysis = session["analysis"]["dead_code_analysis"]
 
+    # Split the items by type in one pass; they don't change after analysis
+    buckets = session.get("dead_code_buckets")
+    if buckets is None:
+        buckets = {"function": [], "class": [], "import": [], "variable": []}
+        for item in dead_code_analysis["detailed_items"]:
+            bucket = buckets.get(item["type"])
+            if bucket is not None:
+                bucket.append(item)
+        session["dead_code_buckets"] = buckets
+
+    # The type buckets are subsets of detailed_items, so its length bounds the pages
+    detailed_items = dead_code_analysis["detailed_items"]
+    end = offset + limit
     return DeadCodeAnalysisResponse(
         total_dead_items=dead_code_analysis["total"],
-        dead_functions=[
-            item
-            for item in dead_code_analysis["detailed_items"]
-            if item["type"] == "function"
-        ],
-        dead_classes=[
-            item
-            for item in dead_code_analysis["detailed_items"]
-            if item["type"] == "class"
-        ],
-        dead_imports=[
-            item
-            for item in dead_code_analysis["detailed_items"]
-            if item["type"] == "import"
-        ],
-        dead_variables=[
-            item
-            for item in dead_code_analysis["detailed_items"]
-            if item["type"] == "variable"
-        ],
-        potential_dead_code=dead_code_analysis["detailed_items"],
+        dead_functions=buckets["function"][offset:end],
+        dead_classes=buckets["class"][offset:end],
+        dead_imports=buckets["import"][offset:end],
+        dead_variables=buckets["variable"][offset:end],
+        potential_dead_code=detailed_items[offset:end],
         recommendations=dead_code_analysis["recommendations"],
+        next_offset=end if end < len(detailed_items) else None,
     )
 
 
@@ -5018,6 +6011,90 @@ async def get_code_quality_metrics(analysis_id: str):
     )
 
 
+# viz_type -> (builder, error to report when the required entry point is missing)
+VISUALIZATION_HANDLERS: Dict[str, Tuple[Callable[[Any, VisualizationRequest], Dict[str, Any]], Optional[str]]] = {
+    "dependency_graph": (
+        lambda viz_engine, request: viz_engine.create_dynamic_dependency_graph(  # Changed to dynamic
+            target_type="codebase",  # Default to codebase-wide
+            target_name="",  # No specific target for codebase-wide
+            scope="codebase",
+            max_depth=request.max_depth,
+            include_external=request.include_external,
+        ),
+        None,
+    ),
+    "call_flow": (
+        lambda viz_engine, request: viz_engine.create_function_call_trace(  # Changed to function_call_trace
+            entry_function=request.entry_point,
+            target_function=request.entry_point,  # For full call flow from entry point
+            max_depth=request.max_depth,
+            compute_metadata=request.compute_metadata,
+        ),
+        "Entry point required for call flow visualization",
+    ),
+    "data_flow": (
+        lambda viz_engine, request: viz_engine.create_data_flow_graph(
+            entry_point=request.entry_point, max_depth=request.max_depth
+        ),
+        "Entry point required for data flow visualization",
+    ),
+    "blast_radius": (
+        lambda viz_engine, request: viz_engine.create_blast_radius_graph(
+            entry_point=request.entry_point, max_depth=request.max_depth
+        ),
+        "Entry point required for blast radius visualization",
+    ),
+    "class_hierarchy": (
+        lambda viz_engine, request: viz_engine.create_class_hierarchy_graph(
+            target_class=request.entry_point,  # entry_point can be a class name
+            include_methods=True,
+            compute_metadata=request.compute_metadata,
+        ),
+        None,
+    ),
+    "module_dependency": (
+        lambda viz_engine, request: viz_engine.create_module_dependency_graph(
+            target_module=request.entry_point,
+            max_depth=request.max_depth,
+            compute_metadata=request.compute_metadata,
+        ),
+        "Entry point (module name) required for module dependency visualization",
+    ),
+}
+
+# transformation_type -> call into EnhancedTransformationEngine
+TRANSFORMATION_HANDLERS: Dict[str, Callable[[Any, TransformationRequest], Dict[str, Any]]] = {
+    "move_symbol": lambda transform_engine, request: transform_engine.move_symbol(
+        symbol_name=request.parameters.get("symbol_name"),
+        target_file=request.target_path,
+        include_dependencies=request.parameters.get("include_dependencies", True),
+        strategy=request.parameters.get("strategy", "update_all_imports"),
+    ),
+    "remove_symbol": lambda transform_engine, request: transform_engine.remove_symbol(
+        symbol_name=request.parameters.get("symbol_name"),
+        safe_mode=request.parameters.get("safe_mode", True),
+    ),
+    "rename_symbol": lambda transform_engine, request: transform_engine.rename_symbol(
+        old_name=request.parameters.get("old_name"),
+        new_name=request.parameters.get("new_name"),
+    ),
+    "resolve_imports": lambda transform_engine, request: transform_engine.resolve_imports(
+        request.target_path
+    ),
+    "add_type_annotations": lambda transform_engine, request: transform_engine.add_type_annotations(
+        symbol_name=request.parameters.get("symbol_name"),
+        return_type=request.parameters.get("return_type"),
+        parameter_types=request.parameters.get("parameter_types"),
+    ),
+    "extract_function": lambda transform_engine, request: transform_engine.extract_function(
+        source_function=request.parameters.get("source_function"),
+        new_function_name=request.parameters.get("new_function_name"),
+        start_line=request.parameters.get("start_line"),
+        end_line=request.parameters.get("end_line"),
+    ),
+}
+
+
 @app.post("/analysis/{analysis_id}/visualize")
 async def create_visualization(analysis_id: str, request: VisualizationRequest):
     """Create a visualization of the codebase"""
@@ -5025,70 +6102,27 @@ async def create_visualization(analysis_id: str, request: VisualizationRequest):
         raise HTTPException(status_code=404, detail="Analysis not found")
 
     try:
-        session = analysis_sessions[analysis_id]
-        # Re-initialize codebase for visualization (or retrieve from session if stored)
-        codebase: Codebase = session["codebase_obj"]  # Retrieve codebase object
-        viz_engine = EnhancedVisualizationEngine(
-            codebase
-        )  # Use EnhancedVisualizationEngine
-
-        # Create visualization based on type
-        if request.viz_type == "dependency_graph":
-            result = viz_engine.create_dynamic_dependency_graph(  # Changed to dynamic
-                target_type="codebase",  # Default to codebase-wide
-                target_name="",  # No specific target for codebase-wide
-                scope="codebase",
-                max_depth=request.max_depth,
-                include_external=request.include_external,
-            )
-        elif request.viz_type == "call_flow":
-            if not request.entry_point:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Entry point required for call flow visualization",
-                )
-            result = viz_engine.create_function_call_trace(  # Changed to function_call_trace
-                entry_function=request.entry_point,
-                target_function=request.entry_point,  # For full call flow from entry point
-                max_depth=request.max_depth,
-            )
-        elif request.viz_type == "data_flow":
-            if not request.entry_point:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Entry point required for data flow visualization",
-                )
-            result = viz_engine.create_data_flow_graph(
-                entry_point=request.entry_point, max_depth=request.max_depth
-            )
-        elif request.viz_type == "blast_radius":
-            if not request.entry_point:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Entry point required for blast radius visualization",
-                )
-            result = viz_engine.create_blast_radius_graph(
-                entry_point=request.entry_point, max_depth=request.max_depth
-            )
-        elif request.viz_type == "class_hierarchy":  # Added
-            result = viz_engine.create_class_hierarchy_graph(
-                target_class=request.entry_point,  # entry_point can be a class name
-                include_methods=True,
-            )
-        elif request.viz_type == "module_dependency":  # Added
-            if not request.entry_point:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Entry point (module name) required for module dependency visualization",
-                )
-            result = viz_engine.create_module_dependency_graph(
-                target_module=request.entry_point, max_depth=request.max_depth
-            )
-        else:
+        handler, missing_entry_point = VISUALIZATION_HANDLERS.get(
+            request.viz_type, (None, None)
+        )
+        if handler is None:
             raise HTTPException(
                 status_code=400,
                 detail=f"Unknown visualization type: {request.viz_type}",
             )
+        if missing_entry_point and not request.entry_point:
+            raise HTTPException(status_code=400, detail=missing_entry_point)
+
+        session = analysis_sessions[analysis_id]
+        # Reuse one engine per session so its codebase indexes survive across requests
+        viz_engine = session.get("viz_engine")
+        if viz_engine is None:
+            viz_engine = EnhancedVisualizationEngine(
+                await get_session_codebase(analysis_id)
+            )
+            session["viz_engine"] = viz_engine
+
+        result = handler(viz_engine, request)
 
         return {
             "visualization_id": str(uuid.uuid4()),
@@ -5098,8 +6132,7 @@ async def create_visualization(analysis_id: str, request: VisualizationRequest):
         }
 
     except Exception as e:
-        logger.error(f"Visualization failed: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"Visualization failed: {e}")
         raise HTTPException(status_code=500, detail=f"Visualization failed: {str(e)}")
 
 
@@ -5110,58 +6143,31 @@ async def apply_transformation(analysis_id: str, request: TransformationRequest)
         raise HTTPException(status_code=404, detail="Analysis not found")
 
     try:
+        handler = TRANSFORMATION_HANDLERS.get(request.transformation_type)
+        if handler is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown transformation type: {request.transformation_type}",
+            )
+
         session = analysis_sessions[analysis_id]
-        # Re-initialize codebase for transformation (or retrieve from session if stored)
-        codebase: Codebase = session["codebase_obj"]  # Retrieve codebase object
+        if request.dry_run:
+            codebase = await get_session_codebase(analysis_id)
+        else:
+            codebase = await get_writable_session_codebase(analysis_id)
 
         transform_engine = EnhancedTransformationEngine(
             codebase
         )  # Use EnhancedTransformationEngine
-
-        # Apply transformation based on type
-        if request.transformation_type == "move_symbol":
-            result = transform_engine.move_symbol(
-                symbol_name=request.parameters.get("symbol_name"),
-                target_file=request.target_path,
-                include_dependencies=request.parameters.get(
-                    "include_dependencies", True
-                ),
-                strategy=request.parameters.get("strategy", "update_all_imports"),
-            )
-        elif request.transformation_type == "remove_symbol":
-            result = transform_engine.remove_symbol(
-                symbol_name=request.parameters.get("symbol_name"),
-                safe_mode=request.parameters.get("safe_mode", True),
-            )
-        elif request.transformation_type == "rename_symbol":
-            result = transform_engine.rename_symbol(
-                old_name=request.parameters.get("old_name"),
-                new_name=request.parameters.get("new_name"),
-            )
-        elif request.transformation_type == "resolve_imports":
-            result = transform_engine.resolve_imports(request.target_path)
-        elif request.transformation_type == "add_type_annotations":
-            result = transform_engine.add_type_annotations(
-                symbol_name=request.parameters.get("symbol_name"),
-                return_type=request.parameters.get("return_type"),
-                parameter_types=request.parameters.get("parameter_types"),
-            )
-        elif request.transformation_type == "extract_function":
-            result = transform_engine.extract_function(
-                source_function=request.parameters.get("source_function"),
-                new_function_name=request.parameters.get("new_function_name"),
-                start_line=request.parameters.get("start_line"),
-                end_line=request.parameters.get("end_line"),
-            )
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unknown transformation type: {request.transformation_type}",
-            )
+        result = handler(transform_engine, request)
 
         # Commit changes if not dry run
         if not request.dry_run and result.get("success"):
             codebase.commit()
+            forget_import_graph(codebase)
+            forget_session_docs(session)
+            if "viz_engine" in session:
+                session["viz_engine"].refresh()
 
         return {
             "transformation_id": str(uuid.uuid4()),
@@ -5172,8 +6178,7 @@ async def apply_transformation(analysis_id: str, request: TransformationRequest)
         }
 
     except Exception as e:
-        logger.error(f"Transformation failed: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"Transformation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Transformation failed: {str(e)}")
 
 
@@ -5188,29 +6193,22 @@ async def generate_documentation(
         raise HTTPException(status_code=404, detail="Analysis not found")
 
     session = analysis_sessions[analysis_id]
-    codebase: Codebase = session["codebase_obj"]
+    # Pages are written into the clone, so a shared one is copied first
+    await get_writable_session_codebase(analysis_id)
     repo_path = session["repo_path"]
 
     docs_output_dir = Path(repo_path) / "generated_docs"
     docs_output_dir.mkdir(exist_ok=True)
 
-    generated_files = []
-
     try:
-        # Generate structured JSON documentation
-        # For simplicity, we'll generate for the whole codebase and then filter for MDX
-        structured_docs = generate_docs_json(
-            codebase, head_commit="latest"
-        )  # Assuming 'latest' or a real commit hash
+        # Structured JSON documentation for the whole codebase, generated once
+        # per session and then filtered for MDX
+        structured_docs = await get_session_docs(session)
 
         if target_type == "codebase":
             classes_to_document = structured_docs.classes
         elif target_type == "class" and target_name:
-            classes_to_document = [
-                cls_doc
-                for cls_doc in structured_docs.classes
-                if cls_doc.title == target_name
-            ]
+            classes_to_document = session["docs_by_class_name"].get(target_name, [])
             if not classes_to_document:
                 raise HTTPException(
                     status_code=404,
@@ -5229,19 +6227,12 @@ async def generate_documentation(
                 status_code=400, detail="Invalid target_type or missing target_name."
             )
 
-        for cls_doc in classes_to_document:
-            mdx_content = render_mdx_page_for_class(cls_doc)
-            mdx_route = (
-                Path(cls_doc.path).with_suffix(".mdx").as_posix()
-            )  # Use class path for MDX route
-
-            # Create subdirectories based on the route
-            output_path = docs_output_dir / mdx_route
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            output_path.write_text(mdx_content)
-            generated_files.append(str(output_path.relative_to(repo_path)))
-            logger.info(f"Generated MDX for {cls_doc.title} at {output_path}")
+        output_paths = await asyncio.to_thread(
+            write_mdx_pages, classes_to_document, docs_output_dir
+        )
+        generated_files = [
+            str(output_path.relative_to(repo_path)) for output_path in output_paths
+        ]
 
         return {
             "message": f"Documentation generated successfully for {target_type}.",
@@ -5250,8 +6241,7 @@ async def generate_documentation(
         }
 
     except Exception as e:
-        logger.error(f"Documentation generation failed: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"Documentation generation failed: {e}")
         raise HTTPException(
             status_code=500, detail=f"Documentation generation failed: {str(e)}"
         )
@@ -5329,13 +6319,16 @@ async def delete_analysis(analysis_id: str):
         raise HTTPException(status_code=404, detail="Analysis not found")
 
     session = analysis_sessions.pop(analysis_id)
+    session_codebases.pop(analysis_id, None)
+    shutdown_session_lsp_server(analysis_id)
 
-    # Clean up temporary directory
-    try:
-        if os.path.exists(session["repo_path"]):
-            shutil.rmtree(session["repo_path"])
-    except Exception as e:
-        logger.warning(f"Failed to clean up temp directory: {e}")
+    # Clean up temporary directory, unless a cached re-analysis still uses it
+    repo_path = session["repo_path"]
+    if not any(other["repo_path"] == repo_path for other in analysis_sessions.values()):
+        try:
+            await asyncio.to_thread(remove_directory, repo_path)
+        except Exception as e:
+            logger.warning(f"Failed to clean up temp directory: {e}")
 
     return {"message": "Analysis deleted successfully"}
 
@@ -5415,28 +6408,128 @@ async def get_capabilities():
 # ============================================================================
 
 
+RM_EXECUTABLE = shutil.which("rm")
+
+
+def remove_directory(path: str) -> bool:
+    """Delete a directory tree, using rm -rf where available; False if it was already gone"""
+    if not os.path.exists(path):
+        return False
+    if RM_EXECUTABLE:
+        result = subprocess.run(
+            [RM_EXECUTABLE, "-rf", "--", path], capture_output=True, text=True
+        )
+        if result.returncode == 0:
+            return True
+        logger.warning(f"rm -rf {path} failed, falling back to shutil: {result.stderr}")
+    shutil.rmtree(path)
+    return True
+
+
+# Seconds a cloned repository is kept before it is removed
+CLEANUP_DELAY = 3600
+
+# (expiry, repo_path) entries drained by a single reaper task
+cleanup_heap: List[Tuple[float, str]] = []
+cleanup_event = asyncio.Event()
+cleanup_reaper_task: Optional[asyncio.Task] = None
+
+
+async def cleanup_reaper():
+    """Remove scheduled temporary directories as their deadlines pass"""
+    while True:
+        now = time.monotonic()
+        while cleanup_heap and cleanup_heap[0][0] <= now:
+            _, repo_path = heapq.heappop(cleanup_heap)
+            # Like delete_analysis, keep a clone that a live session still uses;
+            # that session scheduled its own, later cleanup
+            if any(
+                session["repo_path"] == repo_path and session.get("clone_expires_at", 0) > now
+                for session in analysis_sessions.values()
+            ):
+                continue
+            try:
+                if await asyncio.to_thread(remove_directory, repo_path):
+                    logger.info(f"Cleaned up temporary directory: {repo_path}")
+            except Exception as e:
+                logger.warning(f"Failed to clean up temp directory {repo_path}: {e}")
+
+        timeout = cleanup_heap[0][0] - time.monotonic() if cleanup_heap else None
+        # asyncio.wait, unlike wait_for on Python 3.11, never swallows a
+        # cancellation that arrives as the event is set
+        waiter = asyncio.ensure_future(cleanup_event.wait())
+        try:
+            await asyncio.wait((waiter,), timeout=timeout)
+        finally:
+            waiter.cancel()
+        cleanup_event.clear()
+
+
 async def cleanup_temp_directory(repo_path: str):
-    """Clean up temporary directory after delay"""
-    await asyncio.sleep(3600)  # Wait 1 hour before cleanup
-    try:
-        if os.path.exists(repo_path):
-            shutil.rmtree(repo_path)
-            logger.info(f"Cleaned up temporary directory: {repo_path}")
-    except Exception as e:
-        logger.warning(f"Failed to clean up temp directory {repo_path}: {e}")
+    """Schedule a temporary directory for cleanup after a delay"""
+    global cleanup_reaper_task
+    heapq.heappush(cleanup_heap, (time.monotonic() + CLEANUP_DELAY, repo_path))
+    cleanup_event.set()
+    if cleanup_reaper_task is None or cleanup_reaper_task.done():
+        cleanup_reaper_task = asyncio.create_task(cleanup_reaper())
 
 
-def find_import_cycles(codebase: Codebase) -> List[List[str]]:
-    """Find import cycles in the codebase"""
+def build_import_graph(files: List[SourceFile]) -> nx.DiGraph:
+    """Build the file-level import graph of the given files"""
     import_graph = nx.DiGraph()
+    import_edges = []
+    for file_obj in files:
+        # Bind per-file attributes once; they may be computed properties
+        file_path = file_obj.filepath
+        import_graph.add_node(file_path)
+        import_edges.extend(
+            (file_path, imported_file.filepath)
+            for imp in file_obj.imports
+            if (imported_file := getattr(imp, "from_file", None))
+        )
+    import_graph.add_edges_from(import_edges)
+    return import_graph
 
-    for file_obj in codebase.files:
-        import_graph.add_node(file_obj.filepath)
-        for imp in file_obj.imports:
-            if hasattr(imp, "from_file") and imp.from_file:
-                import_graph.add_edge(file_obj.filepath, imp.from_file.filepath)
 
-    return list(nx.simple_cycles(import_graph))
+# Import graph and files by path per parsed codebase, built on first use.
+# Entries go away with the codebase or when it is changed in place.
+import_graph_cache: "weakref.WeakKeyDictionary[Codebase, Tuple[nx.DiGraph, Dict]]" = weakref.WeakKeyDictionary()
+
+
+def get_import_graph(codebase: Codebase) -> Tuple[nx.DiGraph, Dict[str, SourceFile]]:
+    """Return the codebase's shared import graph and files by path; do not mutate them"""
+    cached = import_graph_cache.get(codebase)
+    if cached is None:
+        # codebase.files builds a new list on every access
+        files = codebase.files
+        cached = (
+            build_import_graph(files),
+            {file_obj.filepath: file_obj for file_obj in files},
+        )
+        import_graph_cache[codebase] = cached
+    return cached
+
+
+def forget_import_graph(codebase: Codebase):
+    """Drop the cached import graph after the codebase was changed in place"""
+    import_graph_cache.pop(codebase, None)
+
+
+def find_import_cycles(codebase: Codebase) -> List[List[str]]:
+    """Find import cycles in the codebase"""
+    import_graph, _ = get_import_graph(codebase)
+
+    # Import graphs are mostly acyclic, so only enumerate cycles inside
+    # strongly connected components that can contain one
+    cycles = []
+    for component in nx.strongly_connected_components(import_graph):
+        if len(component) > 1:
+            cycles.extend(nx.simple_cycles(import_graph.subgraph(component)))
+        else:
+            (file_path,) = component
+            if import_graph.has_edge(file_path, file_path):
+                cycles.append([file_path])
+    return cycles
 
 
 def find_problematic_import_loops(
@@ -5444,35 +6537,58 @@ def find_problematic_import_loops(
 ) -> List[Dict[str, Any]]:
     """Identify cycles with both static and dynamic imports between files"""
     problematic_cycles = []
+    _, files_by_path = get_import_graph(codebase)
+    # filepath -> {imported filepath: [imports]}, grouped once per file
+    imports_by_source: Dict[str, Dict[str, List[Import]]] = {}
 
     for i, cycle in enumerate(cycles):
-        mixed_imports = {}
+        # A file importing itself has no cross-file imports to report
+        if len(cycle) < 2:
+            continue
 
-        for from_file_path in cycle:
-            from_file = next(
-                (f for f in codebase.files if f.filepath == from_file_path), None
-            )
-            if not from_file:
-                continue
+        # from filepath -> {to filepath: import summary}
+        mixed_imports: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        cycle_positions = {path: pos for pos, path in enumerate(cycle)}
 
-            for to_file_path in cycle:
-                if from_file_path == to_file_path:
+        for from_file_path in cycle:
+            imports_by_target = imports_by_source.get(from_file_path)
+            if imports_by_target is None:
+                from_file = files_by_path.get(from_file_path)
+                if not from_file:
                     continue
+                imports_by_target = {}
+                for imp in from_file.imports:
+                    imported_file = getattr(imp, "from_file", None)
+                    if imported_file:
+                        imports_by_target.setdefault(imported_file.filepath, []).append(imp)
+                imports_by_source[from_file_path] = imports_by_target
+            if not imports_by_target:
+                continue
 
-                # Check imports from from_file to to_file
-                imports_to_file = [
-                    imp
-                    for imp in from_file.imports
-                    if hasattr(imp, "from_file")
-                    and imp.from_file
-                    and imp.from_file.filepath == to_file_path
+            # Walk whichever side is smaller, visiting targets in cycle order
+            if len(imports_by_target) < len(cycle):
+                targets_in_cycle = [
+                    to_file_path
+                    for _, to_file_path in sorted(
+                        (cycle_positions[to_file_path], to_file_path)
+                        for to_file_path in imports_by_target.keys() & cycle_positions.keys()
+                    )
                 ]
-
-                if imports_to_file:
-                    mixed_imports[(from_file_path, to_file_path)] = {
-                        "imports": len(imports_to_file),
-                        "import_names": [imp.name for imp in imports_to_file],
-                    }
+            else:
+                targets_in_cycle = [
+                    to_file_path for to_file_path in cycle if to_file_path in imports_by_target
+                ]
+            imports_from_file = {}
+            for to_file_path in targets_in_cycle:
+                if to_file_path == from_file_path:
+                    continue
+                imports_to_file = imports_by_target[to_file_path]
+                imports_from_file[to_file_path] = {
+                    "imports": len(imports_to_file),
+                    "import_names": [imp.name for imp in imports_to_file],
+                }
+            if imports_from_file:
+                mixed_imports[from_file_path] = imports_from_file
 
         if mixed_imports:
             problematic_cycles.append(
@@ -5485,20 +6601,31 @@ def find_problematic_import_loops(
 def convert_all_calls_to_kwargs(codebase: Codebase):
     """Convert all function calls to use keyword arguments"""
     converted_count = 0
+    # Parameter names per called function, shared by all of its call sites.
+    # The definition is kept alongside so its id() cannot be reused.
+    param_names_by_def: Dict[int, Tuple[Any, List[str]]] = {}
 
     for file_obj in codebase.files:
         for function_call in file_obj.function_calls:
             try:
                 # Get function definition
                 func_def = function_call.function_definition
-                if not func_def or isinstance(func_def, ExternalModule):
+                if func_def is None:
                     continue
 
-                # Convert positional args to kwargs
-                for i, arg in enumerate(function_call.args):
-                    if not arg.is_named and i < len(func_def.parameters):
-                        param = func_def.parameters[i]
-                        arg.add_keyword(param.name)
+                cached = param_names_by_def.get(id(func_def))
+                if cached is None:
+                    # External modules have no parameters to name; checked once per definition
+                    if isinstance(func_def, ExternalModule):
+                        cached = (func_def, [])
+                    else:
+                        cached = (func_def, [param.name for param in func_def.parameters])
+                    param_names_by_def[id(func_def)] = cached
+
+                # Convert positional args to kwargs; zip stops at the last parameter
+                for param_name, arg in zip(cached[1], function_call.args):
+                    if not arg.is_named:
+                        arg.add_keyword(param_name)
                         converted_count += 1
 
             except Exception as e:
@@ -5519,18 +6646,12 @@ def apply_fix_to_file(
     This function attempts to replace the lines covered by the diagnostic range.
     If the fixed_code_snippet is a full file, it replaces the entire content.
     """
-    lines = original_content.splitlines(
-        keepends=True
-    )  # Keep newlines for accurate replacement
-
     # Heuristic: If the fixed_code_snippet is very large compared to the original file,
     # or if it contains a shebang/imports, assume it's a full file replacement.
     # This is a simplification; a more robust solution would involve diffing or AST.
     if (
         len(fixed_code_snippet) > len(original_content) * 0.8
-        or fixed_code_snippet.startswith("#!")
-        or "import " in fixed_code_snippet[:100]
-        or "from " in fixed_code_snippet[:100]
+        or FULL_FILE_FIX_PATTERN.match(fixed_code_snippet)
     ):
         logger.info(
             f"Assuming full file replacement for {filepath} based on fixed code size/content."
@@ -5540,19 +6661,52 @@ def apply_fix_to_file(
     start_line_idx = diagnostic_range.line
     end_line_idx = diagnostic_range.end.line
 
-    # Ensure indices are within bounds
-    start_line_idx = max(0, min(start_line_idx, len(lines) - 1))
-    end_line_idx = max(0, min(end_line_idx, len(lines) - 1))
+    if any(
+        brk in original_content or brk in fixed_code_snippet
+        for brk in OTHER_LINE_BREAKS
+    ):
+        # splitlines() also breaks on these, so keep its exact line semantics
+        lines = original_content.splitlines(
+            keepends=True
+        )  # Keep newlines for accurate replacement
 
-    # Replace the block of lines
-    fixed_lines = fixed_code_snippet.splitlines(keepends=True)
+        # Ensure indices are within bounds
+        start_line_idx = max(0, min(start_line_idx, len(lines) - 1))
+        end_line_idx = max(0, min(end_line_idx, len(lines) - 1))
 
-    # Adjust fixed_lines to ensure they end with a newline if the original lines did
-    for i in range(len(fixed_lines)):
-        if not fixed_lines[i].endswith("\n") and (
-            i + start_line_idx < len(lines) and lines[i + start_line_idx].endswith("\n")
+        # End the fix with a newline if the last replaced line had one
+        fixed_code = fixed_code_snippet
+        if (
+            fixed_code
+            and not fixed_code.endswith("\n")
+            and lines
+            and lines[end_line_idx].endswith("\n")
         ):
-            fixed_lines[i] += "\n"
+            fixed_code += "\n"
+
+        # Replace the block of lines
+        return "".join(lines[:start_line_idx]) + fixed_code + "".join(lines[end_line_idx + 1 :])
+
+    # Only "\n" breaks lines here: work on character offsets of the replaced
+    # lines instead of splitting the whole file into a list of lines
+    newline_count = original_content.count("\n")
+    line_count = newline_count + (
+        bool(original_content) and not original_content.endswith("\n")
+    )
+
+    # Ensure indices are within bounds
+    start_line_idx = max(0, min(start_line_idx, line_count - 1))
+    end_line_idx = max(0, min(end_line_idx, line_count - 1))
+
+    # End the fix with a newline if the last replaced line had one; every
+    # line before the final newline-free tail ends with "\n"
+    fixed_code = fixed_code_snippet
+    if (
+        fixed_code
+        and not fixed_code.endswith("\n")
+        and end_line_idx < newline_count
+    ):
+        fixed_code += "\n"
 
     # If the fixed snippet is just one line, and the diagnostic covers multiple lines,
     # it might be a replacement for a block.
@@ -5560,9 +6714,22 @@ def apply_fix_to_file(
     # This simple replacement works for many cases but can be brittle.
     # A proper solution would involve `difflib` or `tree-sitter` based patching.
 
-    # Replace the range
-    new_lines = lines[:start_line_idx] + fixed_lines + lines[end_line_idx + 1 :]
-    return "".join(new_lines)
+    # Split only up to the replaced range; the last part is the untouched rest
+    parts = original_content.split("\n", max(start_line_idx, end_line_idx + 1))
+
+    def line_offset(line_idx: int) -> int:
+        if line_idx >= len(parts):
+            return len(original_content)
+        return sum(map(len, parts[:line_idx])) + line_idx
+
+    # Replace the range; join sizes the result once instead of building a + b first
+    return "".join(
+        (
+            original_content[: line_offset(start_line_idx)],
+            fixed_code,
+            original_content[line_offset(end_line_idx + 1) :],
+        )
+    )
 
 
 # ============================================================================
@@ -5586,4 +6753,8 @@ if __name__ == "__main__":
         port=args.port,
         reload=args.reload,
         log_level=args.log_level,
+        # Sessions live in this process's memory, so this stays a single worker
+        workers=1,
+        loop="uvloop" if UVLOOP_AVAILABLE else "asyncio",
+        http="httptools" if HTTPTOOLS_AVAILABLE else "h11",
     )
@@ -7,6 +7,7 @@ import asyncio
 import logging
 import os
 import re
+import threading
 import time
 from typing import Any, TypedDict
 
@@ -20,6 +21,8 @@ from Serena.solidlsp.lsp_protocol_handler.lsp_types import Diagnostic, DocumentU
 
 logger = logging.getLogger(__name__)
 
+PUBLISH_DIAGNOSTICS = "textDocument/publishDiagnostics"
+
 
 class EnhancedDiagnostic(TypedDict):
     """A diagnostic with comprehensive context for AI resolution."""
@@ -211,6 +214,36 @@ class LSPDiagnosticsManager:
         self.error_frequency = {}
         self.resolution_attempts = {}
 
+        # publishDiagnostics notifications seen per URI, and the count when each URI last changed
+        self.publish_condition = threading.Condition()
+        self.publish_counts: dict[str, int] = {}
+        self.change_marks: dict[str, int] = {}
+        self.publish_hooked = False
+
+    def _hook_publish_diagnostics(self) -> None:
+        """Counts publishDiagnostics notifications, chaining to the wrapper's own handler."""
+        handlers = getattr(getattr(self.lsp_server, "server", None), "on_notification_handlers", None)
+        if not isinstance(handlers, dict):
+            self.logger.log("LSP server exposes no notification handlers; diagnostics waits will poll.", logging.INFO)
+            return
+        store_diagnostics = handlers.get(PUBLISH_DIAGNOSTICS)
+
+        def on_publish_diagnostics(params: dict[str, Any]) -> None:
+            if store_diagnostics is not None:
+                store_diagnostics(params)
+            with self.publish_condition:
+                self.publish_counts[params["uri"]] = self.publish_counts.get(params["uri"], 0) + 1
+                self.publish_condition.notify_all()
+
+        handlers[PUBLISH_DIAGNOSTICS] = on_publish_diagnostics
+        self.publish_hooked = True
+
+    def _mark_changed(self, relative_file_path: str) -> None:
+        """Remembers how many publishes a file had before its latest change."""
+        uri = PathUtils.path_to_uri(os.path.join(self.repository_root_path, relative_file_path))
+        with self.publish_condition:
+            self.change_marks[uri] = self.publish_counts.get(uri, 0)
+
     def start_server(self) -> None:
         """Starts the LSP server and initializes it."""
         if self.lsp_server is None:
@@ -219,11 +252,13 @@ class LSPDiagnosticsManager:
             )
         self.logger.log(f"Starting LSP server for {self.language.value} at {self.repository_root_path}", logging.INFO)
         self.lsp_server.start()
+        self._hook_publish_diagnostics()
         self.logger.log("LSP server started.", logging.INFO)
 
     def open_file(self, relative_file_path: str, content: str) -> None:
         """Notifies the LSP server that a file has been opened."""
         if self.lsp_server:
+            self._mark_changed(relative_file_path)
             self.lsp_server.open_file(relative_file_path, content)
         else:
             self.logger.log("LSP server not started. Cannot open file.", logging.WARNING)
@@ -231,6 +266,7 @@ class LSPDiagnosticsManager:
     def change_file(self, relative_file_path: str, content: str) -> None:
         """Notifies the LSP server that a file has been changed."""
         if self.lsp_server:
+            self._mark_changed(relative_file_path)
             self.lsp_server.change_file(relative_file_path, content)
         else:
             self.logger.log("LSP server not started. Cannot change file.", logging.WARNING)
@@ -244,6 +280,37 @@ class LSPDiagnosticsManager:
             self.logger.log("LSP server not started. Cannot get diagnostics.", logging.WARNING)
             return []
 
+    async def wait_for_diagnostics(self, relative_file_path: str, previous: list[Diagnostic], timeout: float = 2.0) -> list[Diagnostic]:
+        """Waits until the server re-publishes diagnostics for a file after its latest change.
+
+        Returns the latest diagnostics once they are published, even if unchanged, or when
+        `timeout` seconds have passed. Without a publishDiagnostics hook on the server wrapper,
+        polls with backoff until the diagnostics differ from `previous` instead.
+        """
+        if self.publish_hooked:
+            uri = PathUtils.path_to_uri(os.path.join(self.repository_root_path, relative_file_path))
+
+            def republished() -> bool:
+                return self.publish_counts.get(uri, 0) > self.change_marks.get(uri, 0)
+
+            def wait_republished() -> None:
+                with self.publish_condition:
+                    self.publish_condition.wait_for(republished, timeout)
+
+            await asyncio.to_thread(wait_republished)
+            return self.get_diagnostics(relative_file_path)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.05
+        while True:
+            diagnostics = self.get_diagnostics(relative_file_path)
+            remaining = deadline - loop.time()
+            if diagnostics != previous or remaining <= 0:
+                return diagnostics
+            await asyncio.sleep(min(delay, remaining))
+            delay *= 2
+
     def get_all_enhanced_diagnostics(self, runtime_log_path: str | None = None, ui_log_path: str | None = None) -> list[EnhancedDiagnostic]:
         """Retrieves all collected diagnostics from the LSP server, enriched with comprehensive context."""
         if not self.lsp_server:
@@ -434,11 +434,9 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
             tree = ast.parse(self.source, filename=self.file_path)
             
             # Multiple passes for comprehensive analysis
-            self.visit(tree)  # First pass: collect definitions
-            self._analyze_undefined_names()  # Second pass: find undefined
+            self.visit(tree)  # First pass: collect definitions, dead code and type checks
+            self._analyze_undefined_names(tree)  # Second pass: find undefined
             self._analyze_unused_variables()  # Third pass: find unused
-            self._analyze_unreachable_code(tree)  # Fourth pass: dead code
-            self._analyze_type_consistency(tree)  # Fifth pass: type checks
             
             return self.errors
         except SyntaxError as e:
@@ -505,6 +503,9 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
                 error_code="E0108"
             ))
         
+        # Detect unreachable code after return/raise
+        self._check_function_reachability(node)
+        
         self.generic_visit(node)
         
         # Exit function scope
@@ -631,26 +632,39 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
         # Simplified check - in real implementation, track loop nesting
         self.generic_visit(node)
     
-    def _analyze_undefined_names(self):
+    def _analyze_undefined_names(self, tree: ast.AST):
         """Find undefined names (used but not defined)"""
         builtin_names = set(dir(builtins))
+        undefined_names = [
+            name for name in self.used_names
+            if name not in self.defined_names and name not in builtin_names
+        ]
+        if not undefined_names:
+            return
         
-        for name in self.used_names:
-            if name not in self.defined_names and name not in builtin_names:
-                # Try to find where it's used
-                for node in ast.walk(ast.parse(self.source)):
-                    if isinstance(node, ast.Name) and node.id == name and isinstance(node.ctx, ast.Load):
-                        self.errors.append(AnalysisError(
-                            file_path=self.file_path,
-                            category=ErrorCategory.REFERENCE.value,
-                            severity=Severity.ERROR.value,
-                            message=f"Undefined variable '{name}'",
-                            line=node.lineno,
-                            column=node.col_offset,
-                            error_code="E0602",
-                            fix_suggestion=f"Define '{name}' before using it or check for typos"
-                        ))
-                        break
+        # Find where each is first used in one walk of the already parsed tree
+        first_uses: Dict[str, ast.Name] = {}
+        pending = set(undefined_names)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id in pending and isinstance(node.ctx, ast.Load):
+                first_uses[node.id] = node
+                pending.discard(node.id)
+                if not pending:
+                    break
+        
+        for name in undefined_names:
+            node = first_uses.get(name)
+            if node is not None:
+                self.errors.append(AnalysisError(
+                    file_path=self.file_path,
+                    category=ErrorCategory.REFERENCE.value,
+                    severity=Severity.ERROR.value,
+                    message=f"Undefined variable '{name}'",
+                    line=node.lineno,
+                    column=node.col_offset,
+                    error_code="E0602",
+                    fix_suggestion=f"Define '{name}' before using it or check for typos"
+                ))
     
     def _analyze_unused_variables(self):
         """Find unused variables (defined but not used)"""
@@ -674,12 +688,6 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
                                     error_code="F841"
                                 ))
     
-    def _analyze_unreachable_code(self, tree: ast.AST):
-        """Detect unreachable code after return/raise"""
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                self._check_function_reachability(node)
-    
     def _check_function_reachability(self, func: Union[ast.FunctionDef, ast.AsyncFunctionDef]):
         """Check for unreachable code in function"""
         for i, stmt in enumerate(func.body):
@@ -697,29 +705,27 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
                         error_code="W0101"
                     ))
     
-    def _analyze_type_consistency(self, tree: ast.AST):
+    def visit_BinOp(self, node: ast.BinOp):
         """Basic type consistency checking"""
-        for node in ast.walk(tree):
-            # Check for common type errors
-            if isinstance(node, ast.BinOp):
-                # Check operations like string + int
-                if isinstance(node.op, ast.Add):
-                    left = node.left
-                    right = node.right
-                    
-                    # Simple heuristic: check literal types
-                    if isinstance(left, ast.Constant) and isinstance(right, ast.Constant):
-                        if type(left.value) != type(right.value):
-                            if isinstance(left.value, str) or isinstance(right.value, str):
-                                self.errors.append(AnalysisError(
-                                    file_path=self.file_path,
-                                    category=ErrorCategory.TYPE.value,
-                                    severity=Severity.ERROR.value,
-                                    message="Cannot concatenate string with non-string type",
-                                    line=node.lineno,
-                                    column=node.col_offset,
-                                    error_code="E1131"
-                                ))
+        # Check operations like string + int
+        if isinstance(node.op, ast.Add):
+            left = node.left
+            right = node.right
+            
+            # Simple heuristic: check literal types
+            if isinstance(left, ast.Constant) and isinstance(right, ast.Constant):
+                if type(left.value) != type(right.value):
+                    if isinstance(left.value, str) or isinstance(right.value, str):
+                        self.errors.append(AnalysisError(
+                            file_path=self.file_path,
+                            category=ErrorCategory.TYPE.value,
+                            severity=Severity.ERROR.value,
+                            message="Cannot concatenate string with non-string type",
+                            line=node.lineno,
+                            column=node.col_offset,
+                            error_code="E1131"
+                        ))
+        self.generic_visit(node)
 
 
 # ============================================================================
@@ -1499,11 +1505,9 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
             tree = ast.parse(self.source, filename=self.file_path)
             
             # Multiple passes for comprehensive analysis
-            self.visit(tree)  # First pass: collect definitions
-            self._analyze_undefined_names()  # Second pass: find undefined
+            self.visit(tree)  # First pass: collect definitions, dead code and type checks
+            self._analyze_undefined_names(tree)  # Second pass: find undefined
             self._analyze_unused_variables()  # Third pass: find unused
-            self._analyze_unreachable_code(tree)  # Fourth pass: dead code
-            self._analyze_type_consistency(tree)  # Fifth pass: type checks
             
             return self.errors
         except SyntaxError as e:
@@ -1570,6 +1574,9 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
                 error_code="E0108"
             ))
         
+        # Detect unreachable code after return/raise
+        self._check_function_reachability(node)
+        
         self.generic_visit(node)
         
         # Exit function scope
@@ -1696,26 +1703,39 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
         # Simplified check - in real implementation, track loop nesting
         self.generic_visit(node)
     
-    def _analyze_undefined_names(self):
+    def _analyze_undefined_names(self, tree: ast.AST):
         """Find undefined names (used but not defined)"""
         builtin_names = set(dir(builtins))
+        undefined_names = [
+            name for name in self.used_names
+            if name not in self.defined_names and name not in builtin_names
+        ]
+        if not undefined_names:
+            return
         
-        for name in self.used_names:
-            if name not in self.defined_names and name not in builtin_names:
-                # Try to find where it's used
-                for node in ast.walk(ast.parse(self.source)):
-                    if isinstance(node, ast.Name) and node.id == name and isinstance(node.ctx, ast.Load):
-                        self.errors.append(AnalysisError(
-                            file_path=self.file_path,
-                            category=ErrorCategory.REFERENCE.value,
-                            severity=Severity.ERROR.value,
-                            message=f"Undefined variable '{name}'",
-                            line=node.lineno,
-                            column=node.col_offset,
-                            error_code="E0602",
-                            fix_suggestion=f"Define '{name}' before using it or check for typos"
-                        ))
-                        break
+        # Find where each is first used in one walk of the already parsed tree
+        first_uses: Dict[str, ast.Name] = {}
+        pending = set(undefined_names)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id in pending and isinstance(node.ctx, ast.Load):
+                first_uses[node.id] = node
+                pending.discard(node.id)
+                if not pending:
+                    break
+        
+        for name in undefined_names:
+            node = first_uses.get(name)
+            if node is not None:
+                self.errors.append(AnalysisError(
+                    file_path=self.file_path,
+                    category=ErrorCategory.REFERENCE.value,
+                    severity=Severity.ERROR.value,
+                    message=f"Undefined variable '{name}'",
+                    line=node.lineno,
+                    column=node.col_offset,
+                    error_code="E0602",
+                    fix_suggestion=f"Define '{name}' before using it or check for typos"
+                ))
     
     def _analyze_unused_variables(self):
         """Find unused variables (defined but not used)"""
@@ -1739,12 +1759,6 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
                                     error_code="F841"
                                 ))
     
-    def _analyze_unreachable_code(self, tree: ast.AST):
-        """Detect unreachable code after return/raise"""
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                self._check_function_reachability(node)
-    
     def _check_function_reachability(self, func: Union[ast.FunctionDef, ast.AsyncFunctionDef]):
         """Check for unreachable code in function"""
         for i, stmt in enumerate(func.body):
@@ -1762,29 +1776,27 @@ class AdvancedASTAnalyzer(ast.NodeVisitor):
                         error_code="W0101"
                     ))
     
-    def _analyze_type_consistency(self, tree: ast.AST):
+    def visit_BinOp(self, node: ast.BinOp):
         """Basic type consistency checking"""
-        for node in ast.walk(tree):
-            # Check for common type errors
-            if isinstance(node, ast.BinOp):
-                # Check operations like string + int
-                if isinstance(node.op, ast.Add):
-                    left = node.left
-                    right = node.right
-                    
-                    # Simple heuristic: check literal types
-                    if isinstance(left, ast.Constant) and isinstance(right, ast.Constant):
-                        if type(left.value) != type(right.value):
-                            if isinstance(left.value, str) or isinstance(right.value, str):
-                                self.errors.append(AnalysisError(
-                                    file_path=self.file_path,
-                                    category=ErrorCategory.TYPE.value,
-                                    severity=Severity.ERROR.value,
-                                    message="Cannot concatenate string with non-string type",
-                                    line=node.lineno,
-                                    column=node.col_offset,
-                                    error_code="E1131"
-                                ))
+        # Check operations like string + int
+        if isinstance(node.op, ast.Add):
+            left = node.left
+            right = node.right
+            
+            # Simple heuristic: check literal types
+            if isinstance(left, ast.Constant) and isinstance(right, ast.Constant):
+                if type(left.value) != type(right.value):
+                    if isinstance(left.value, str) or isinstance(right.value, str):
+                        self.errors.append(AnalysisError(
+                            file_path=self.file_path,
+                            category=ErrorCategory.TYPE.value,
+                            severity=Severity.ERROR.value,
+                            message="Cannot concatenate string with non-string type",
+                            line=node.lineno,
+                            column=node.col_offset,
+                            error_code="E1131"
+                        ))
+        self.generic_visit(node)
 
 
 # ============================================================================
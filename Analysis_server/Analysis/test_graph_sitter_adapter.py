@@ -0,0 +1,110 @@
+"""
+Tests for graph_sitter_adapter helpers.
+Run with: python -m pytest test_graph_sitter_adapter.py -v
+"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("graph_sitter")
+
+from graph_sitter_adapter import (
+    FULL_FILE_FIX_PATTERN,
+    EnhancedVisualizationEngine,
+    apply_fix_to_file,
+)
+
+
+def make_range(start_line, end_line):
+    """Minimal stand-in for an LSP Range (0-based lines)"""
+    return SimpleNamespace(line=start_line, end=SimpleNamespace(line=end_line))
+
+
+def make_call_graph(calls):
+    """Fake functions wired by (caller, callee) name pairs, with call sites both ways"""
+    functions = {}
+    for name in dict.fromkeys(name for pair in calls for name in pair):
+        functions[name] = SimpleNamespace(
+            name=name, filepath="module.py", function_calls=[], call_sites=[]
+        )
+    for caller, callee in calls:
+        functions[caller].function_calls.append(
+            SimpleNamespace(function_definition=functions[callee])
+        )
+        functions[callee].call_sites.append(
+            SimpleNamespace(parent_function=functions[caller])
+        )
+    return SimpleNamespace(get_function=functions.get)
+
+
+def test_full_file_fix_pattern():
+    """Module-like fixes match; indented or non-leading imports do not."""
+    assert FULL_FILE_FIX_PATTERN.match("#!/usr/bin/env python\nx = 1\n")
+    assert FULL_FILE_FIX_PATTERN.match("import os\n")
+    assert FULL_FILE_FIX_PATTERN.match("# Copyright\n# -*- coding: utf-8 -*-\n\nfrom a import b\n")
+    assert FULL_FILE_FIX_PATTERN.match('"""Module docstring."""\n\nimport os\n')
+    assert not FULL_FILE_FIX_PATTERN.match("    import x\n    x.run()\n")
+    assert not FULL_FILE_FIX_PATTERN.match("def f():\n    import x\n")
+    assert not FULL_FILE_FIX_PATTERN.match("x = 1\nimport os\n")
+
+
+def test_partial_fix_with_indented_import_keeps_rest_of_file():
+    """A function-body fix containing an import replaces only its lines."""
+    original = (
+        "import sys\n"
+        "\n"
+        "\n"
+        "def first():\n"
+        "    return sys.argv\n"
+        "\n"
+        "\n"
+        "def second():\n"
+        "    return undefined_name.path\n"
+        "\n"
+        "\n"
+        "def third():\n"
+        "    return sys.version\n"
+    )
+    fix = "    import os\n    return os.path\n"
+
+    result = apply_fix_to_file("module.py", original, fix, make_range(8, 8))
+
+    assert result == original.replace("    return undefined_name.path\n", fix)
+    assert "def first():" in result
+    assert "def third():" in result
+
+
+def test_call_trace_picks_shortest_of_two_meeting_points():
+    """The longer route through 'a' is seen first, but the trace takes the shorter one via 'b'."""
+    codebase = make_call_graph(
+        [
+            ("start", "a"),
+            ("start", "b"),
+            ("a", "c"),
+            ("c", "end"),
+            ("b", "end"),
+        ]
+    )
+    engine = EnhancedVisualizationEngine(codebase)
+
+    trace = engine.create_function_call_trace("start", "end", compute_metadata=False)
+
+    assert [node["id"] for node in trace["nodes"]] == ["start", "b", "end"]
+    assert [(edge["source"], edge["target"]) for edge in trace["edges"]] == [
+        ("start", "b"),
+        ("b", "end"),
+    ]
+
+
+def test_cached_graph_returns_independent_copies():
+    """Mutating a returned graph must not change what later calls get from the cache."""
+    engine = EnhancedVisualizationEngine(make_call_graph([("start", "end")]))
+
+    first = engine.create_function_call_trace("start", "end", compute_metadata=False)
+    first["nodes"].clear()
+    first["metadata"]["target"] = "changed"
+
+    second = engine.create_function_call_trace("start", "end", compute_metadata=False)
+    assert [node["id"] for node in second["nodes"]] == ["start", "end"]
+    assert second["metadata"]["target"] == "start -> end"
+    assert len(engine.graph_cache) == 1
@@ -83,6 +83,7 @@ class LSPClient:
         self.server_config: Optional[LSPServerConfig] = None
         self.root_uri: Optional[str] = None
         self.diagnostics_cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._diagnostics_events: Dict[str, asyncio.Event] = {}
         self._response_queue: Dict[int, asyncio.Future] = {}
         self._reader_task: Optional[asyncio.Task] = None
 
@@ -215,35 +216,55 @@ class LSPClient:
             logger.error(f"Failed to send message: {e}")
             raise
 
+    def _read_message_blocking(self) -> Optional[Dict[str, Any]]:
+        """
+        Read one JSON-RPC message from the server's buffered stdout.
+
+        Blocks until a full message arrives, so it runs in a worker thread.
+
+        Returns:
+            Parsed message or None if it had no content
+
+        Raises:
+            EOFError: If the server closed its output
+        """
+        stdout = self.process.stdout
+
+        # Read headers up to the blank separator line
+        content_length = 0
+        while True:
+            line = stdout.readline()
+            if not line:
+                raise EOFError("LSP server closed its output")
+            line = line.strip()
+            if not line:
+                break
+            key, _, value = line.partition(b':')
+            if key.strip().lower() == b'content-length':
+                content_length = int(value)
+
+        # Read content
+        if content_length == 0:
+            return None
+        return json.loads(stdout.read(content_length))
+
     async def _read_message(self) -> Optional[Dict[str, Any]]:
         """
-        Read JSON-RPC message from server.
+        Read JSON-RPC message from server without blocking the event loop.
 
         Returns:
             Parsed message or None on error
+
+        Raises:
+            EOFError: If the server closed its output
         """
         if not self.process or not self.process.stdout:
             return None
 
         try:
-            # Read headers
-            headers = {}
-            while True:
-                line = self.process.stdout.readline().decode().strip()
-                if not line:
-                    break
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    headers[key.strip()] = value.strip()
-
-            # Read content
-            content_length = int(headers.get('Content-Length', 0))
-            if content_length == 0:
-                return None
-
-            content = self.process.stdout.read(content_length).decode()
-            return json.loads(content)
-
+            return await asyncio.to_thread(self._read_message_blocking)
+        except EOFError:
+            raise
         except Exception as e:
             logger.error(f"Failed to read message: {e}")
             return None
@@ -252,16 +273,14 @@ class LSPClient:
         """Background task to read messages from server."""
         while self.process and self.process.poll() is None:
             try:
-                message = await asyncio.wait_for(
-                    self._read_message(),
-                    timeout=0.1
-                )
+                # Waits in a worker thread; a timeout here would drop a half-read message
+                message = await self._read_message()
 
                 if message:
                     await self._handle_message(message)
 
-            except asyncio.TimeoutError:
-                continue
+            except EOFError:
+                break
             except Exception as e:
                 logger.error(f"Message reader error: {e}")
                 break
@@ -291,6 +310,9 @@ class LSPClient:
                 diagnostics = params.get('diagnostics', [])
                 if uri:
                     self.diagnostics_cache[uri] = diagnostics
+                    published = self._diagnostics_events.get(uri)
+                    if published:
+                        published.set()
 
     async def _request(
         self,
@@ -667,12 +689,19 @@ class LSPClient:
         if not self.initialized:
             return []
 
-        await self.open_document(file_path)
+        uri = self._path_to_uri(file_path)
 
-        # Wait a bit for diagnostics to arrive
-        await asyncio.sleep(0.5)
+        # Armed before opening so a quick publish is not missed
+        published = self._diagnostics_events.setdefault(uri, asyncio.Event())
+        published.clear()
+
+        if await self.open_document(file_path):
+            # Wait for the server to publish diagnostics, at most 0.5s
+            try:
+                await asyncio.wait_for(published.wait(), timeout=0.5)
+            except asyncio.TimeoutError:
+                pass
 
-        uri = self._path_to_uri(file_path)
         return self.diagnostics_cache.get(uri, [])
 
     async def shutdown(self) -> None:
@@ -708,6 +737,7 @@ class LSPClient:
         self.process = None
         self._response_queue.clear()
         self.diagnostics_cache.clear()
+        self._diagnostics_events.clear()
 
         logger.info("LSP server shutdown complete")
 